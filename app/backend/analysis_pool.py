@@ -0,0 +1,189 @@
+import asyncio
+import math
+import multiprocessing
+import os
+import time
+from contextlib import asynccontextmanager
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+# -------------------- CONFIGURATION --------------------
+# ANALYSIS_EXECUTOR: "process" (default, scales with cores), "thread" or "inline"
+ANALYSIS_EXECUTOR = os.getenv("ANALYSIS_EXECUTOR", "process").lower()
+ANALYSIS_WORKERS = int(os.getenv("ANALYSIS_WORKERS", str(os.cpu_count() or 1)))
+# Jobs allowed in flight (running + queued) before callers get PoolSaturated; a PDF split
+# across the pool by extract_pdf_file() counts as one job
+ANALYSIS_MAX_PENDING = int(os.getenv("ANALYSIS_MAX_PENDING", str(ANALYSIS_WORKERS * 4)))
+ANALYSIS_START_METHOD = os.getenv("ANALYSIS_START_METHOD", "spawn")
+# Minimum pages handed to one worker when a PDF is split across the pool
+PDF_PAGES_PER_TASK = int(os.getenv("PDF_PAGES_PER_TASK", "8"))
+
+_executor = None
+_pending = 0
+_rejected = 0
+_completed = 0
+_failed = 0
+
+
+class PoolSaturated(Exception):
+    """Raised when the analysis pool already has ANALYSIS_MAX_PENDING jobs in flight"""
+
+
+def _warm_up():
+    # Load the models and heavy imports once per worker instead of on its first job
+    import ml_model
+    import nlp_utils
+    nlp_utils.preload()
+    try:
+        ml_model.load_models()
+    except ml_model.ModelNotAvailable:
+        pass
+
+
+def get_executor():
+    global _executor
+    if _executor is None and ANALYSIS_EXECUTOR != "inline":
+        if ANALYSIS_EXECUTOR == "thread":
+            _executor = ThreadPoolExecutor(max_workers=ANALYSIS_WORKERS, thread_name_prefix="analysis")
+        else:
+            _executor = ProcessPoolExecutor(
+                max_workers=ANALYSIS_WORKERS,
+                mp_context=multiprocessing.get_context(ANALYSIS_START_METHOD),
+                initializer=_warm_up,
+            )
+    return _executor
+
+
+@asynccontextmanager
+async def _admit():
+    """Hold one of the ANALYSIS_MAX_PENDING slots for the duration of a job"""
+    global _pending, _rejected, _completed, _failed
+    if _pending >= ANALYSIS_MAX_PENDING:
+        _rejected += 1
+        raise PoolSaturated(f"{_pending} analysis jobs already in flight")
+
+    _pending += 1
+    try:
+        yield
+    except Exception:
+        _failed += 1
+        raise
+    else:
+        _completed += 1
+    finally:
+        _pending -= 1
+
+
+async def _execute(fn, *args):
+    executor = get_executor()
+    if executor is None:
+        return fn(*args)
+    return await asyncio.get_running_loop().run_in_executor(executor, fn, *args)
+
+
+async def run(fn, *args):
+    """Run a CPU-bound fn(*args) on the analysis pool without blocking the event loop"""
+    async with _admit():
+        return await _execute(fn, *args)
+
+
+async def extract_pdf_file(path, max_pages=None):
+    """
+    Extract a PDF's text with its pages spread across the pool.
+
+    The first PDF_PAGES_PER_TASK pages are read together with the page
+    count; the remaining pages (up to max_pages) are split into at most
+    ANALYSIS_WORKERS ranges extracted in parallel and joined once. The
+    upload is admitted once, so a large PDF takes a single pending slot.
+    """
+    from nlp_utils import MAX_PDF_PAGES, join_pages
+    max_pages = MAX_PDF_PAGES if max_pages is None else max_pages
+
+    async with _admit():
+        first_stop = min(PDF_PAGES_PER_TASK, max_pages)
+        page_texts, total_pages = await _execute(extract_pdf_page_range, path, 0, first_stop)
+
+        last = min(total_pages, max_pages)
+        if last > first_stop:
+            remaining = last - first_stop
+            n_tasks = min(ANALYSIS_WORKERS, math.ceil(remaining / PDF_PAGES_PER_TASK))
+            step = math.ceil(remaining / n_tasks)
+            ranges = [(start, min(start + step, last)) for start in range(first_stop, last, step)]
+            chunks = await asyncio.gather(*(_execute(extract_pdf_page_range, path, start, stop) for start, stop in ranges))
+            for chunk_texts, _ in chunks:
+                page_texts.extend(chunk_texts)
+
+    return join_pages(page_texts)
+
+
+async def prewarm():
+    """Start every worker now (running its warm-up) instead of on the first requests"""
+    if get_executor() is None:
+        return
+    await asyncio.gather(*(run(os.getpid) for _ in range(ANALYSIS_WORKERS)))
+
+
+def shutdown():
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+def stats():
+    return {
+        "mode": ANALYSIS_EXECUTOR,
+        "workers": ANALYSIS_WORKERS,
+        "max_pending": ANALYSIS_MAX_PENDING,
+        "pending": _pending,
+        "completed": _completed,
+        "failed": _failed,
+        "rejected": _rejected,
+    }
+
+
+# -------------------- POOL TASKS --------------------
+# Top-level functions so they can be pickled into worker processes
+
+def extract_pdf_page_range(path, start, stop):
+    """Extract text of pages [start, stop) from a spooled PDF; returns (page_texts, total_pages)"""
+    from nlp_utils import extract_pdf_pages
+    return extract_pdf_pages(path, start, stop)
+
+
+def extract_pdf_text(path):
+    """Extract the whole text of a spooled PDF in one task (used when many PDFs run side by side)"""
+    from nlp_utils import MAX_PDF_PAGES, extract_pdf_pages, join_pages
+    page_texts, _ = extract_pdf_pages(path, 0, MAX_PDF_PAGES)
+    return join_pages(page_texts)
+
+
+def resume_features(text):
+    """Feature vector and detected skills for one resume (scoring is batched separately)"""
+    from nlp_utils import ResumeDocument
+    doc = ResumeDocument(text)
+    return {"features": doc.features, "skills": doc.skills}
+
+
+def score_feature_rows(feature_rows):
+    """Score many resume feature vectors in one model call"""
+    from ml_model import predict_resume_scores
+    return predict_resume_scores(feature_rows)
+
+
+def score_resume_text(text):
+    """Feature extraction, ML score and skill detection for one resume, with per-step timings"""
+    from ml_model import predict_resume_score, resume_model_version
+    from nlp_utils import ResumeDocument
+    started = time.perf_counter()
+    doc = ResumeDocument(text)
+    features, skills = doc.features, doc.skills
+    extracted = time.perf_counter()
+    score = predict_resume_score(features)
+    return {
+        "features": features,
+        "score": score,
+        "skills": skills,
+        "model_version": resume_model_version(),
+        # Measured in the worker, so they exclude pool queueing and pickling
+        "timings": {"feature_extract": extracted - started, "model_predict": time.perf_counter() - extracted},
+    }
@@ -0,0 +1,153 @@
+"""
+Load-test the FastAPI app in-process, with MongoDB and every HTTP provider stubbed locally.
+
+    python -m benchmarks.bench_api                                  # all scenarios
+    python -m benchmarks.bench_api --scenarios predict analyze_resume_pdf --requests 500 --concurrency 32
+    python -m benchmarks.bench_api --mongo-latency-ms 2 --upstream-latency-ms 150
+    python -m benchmarks.bench_api --baseline bench_api.json --tolerance 0.2
+
+Requests go through httpx.ASGITransport straight into server.app (routing,
+validation, auth, the analysis pool, write-behind, caches and circuit
+breakers all included; no sockets). MongoDB is replaced by in-memory
+collections and Adzuna/YouTube/RapidAPI/Lyzr by an httpx.MockTransport,
+each with an optional simulated latency. Reports requests/sec and p50/p99
+per scenario, plus requests shed with 429 when the analysis pool is full
+(raise ANALYSIS_MAX_PENDING or lower --concurrency to avoid them); with
+--baseline, exits 1 on regressions or failed requests.
+"""
+import argparse
+import asyncio
+import random
+import tempfile
+from pathlib import Path
+
+import httpx
+
+import analysis_pool
+import http_client
+import passwords
+import server
+import write_behind
+from job_corpus import job_corpus
+from nlp_utils import COMMON_SKILLS
+
+from benchmarks import stubs
+from benchmarks.harness import REJECTED, add_baseline_args, bench_concurrent, finish
+from benchmarks.resumes import make_pdf, make_resume
+
+ROLES = ["software_engineer", "data_scientist", "frontend_developer", "devops_engineer", "ml_engineer"]
+
+
+def _profile(rng):
+    return {
+        "age": rng.randint(21, 45), "experience_years": rng.randint(0, 15), "education_level": rng.randint(1, 3),
+        "num_skills": rng.randint(1, 15), "location_tier": rng.randint(1, 3), "job_changes": rng.randint(0, 6),
+    }
+
+
+def build_scenarios(client, token, args):
+    """name -> async fn(i) returning True when request i succeeded"""
+    rng = random.Random(0)
+    auth = {"Authorization": f"Bearer {token}"}
+    skill_sets = [rng.sample(COMMON_SKILLS, rng.randint(1, 5)) for _ in range(50)]
+    # Distinct resumes per request so every analysis is computed, not served from the resume memo
+    unique_pdfs = [make_pdf(make_resume(10_000 + i, args.pages)) for i in range(args.requests)]
+    duplicate_pdf = make_pdf(make_resume(0, args.pages))
+
+    async def ok(request):
+        response = await request
+        if response.status_code == 429:
+            return REJECTED
+        return response.status_code == 200
+
+    async def predict(i):
+        return await ok(client.post("/api/predict", json=_profile(rng)))
+
+    async def predict_batch(i):
+        return await ok(client.post("/api/predict", json=[_profile(rng) for _ in range(32)]))
+
+    async def analyze_resume_text(i):
+        return await ok(client.post("/api/analyze-resume", data={"resume_text": make_resume(20_000 + i, args.pages)}))
+
+    async def analyze_resume_pdf(i):
+        pdf = unique_pdfs[i] if i >= 0 else duplicate_pdf
+        return await ok(client.post("/api/analyze-resume", files={"file": ("resume.pdf", pdf, "application/pdf")}))
+
+    async def analyze_resume_duplicate(i):
+        return await ok(client.post("/api/analyze-resume", files={"file": ("resume.pdf", duplicate_pdf, "application/pdf")}))
+
+    async def recommend_jobs(i):
+        return await ok(client.post("/api/recommend_jobs", json={"skills": skill_sets[i % len(skill_sets)]}))
+
+    async def learning_path(i):
+        body = {"skills": skill_sets[i % len(skill_sets)], "target_role": ROLES[i % len(ROLES)]}
+        return await ok(client.post("/api/learning_path", json=body, headers=auth))
+
+    async def chat(i):
+        return await ok(client.post("/api/chat", json={"message": "How do I prepare for an interview?"}))
+
+    async def chat_stream(i):
+        async with client.stream("POST", "/api/chat", json={"message": "resume tips", "stream": True}) as response:
+            body = await response.aread()
+            return response.status_code == 200 and b"event: done" in body
+
+    async def dashboard(i):
+        return await ok(client.get("/api/dashboard", headers=auth))
+
+    async def login(i):
+        return await ok(client.post("/api/auth/login", json={"email": "bench@example.com", "password": "bench-password"}))
+
+    return {fn.__name__: fn for fn in (
+        predict, predict_batch, analyze_resume_text, analyze_resume_pdf, analyze_resume_duplicate,
+        recommend_jobs, learning_path, chat, chat_stream, dashboard, login,
+    )}
+
+
+async def run(args):
+    stubs.install_mongo(args.mongo_latency_ms / 1000)
+    stubs.install_providers(args.upstream_latency_ms / 1000)
+    # Empty local job corpus, so /recommend_jobs exercises the (stubbed) live Adzuna path
+    job_corpus.path = Path(tempfile.mkdtemp()) / "jobs.joblib"
+    passwords.configure(rounds=args.bcrypt_rounds)
+    write_behind.start()
+    await server._prewarm()
+
+    transport = httpx.ASGITransport(app=server.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        signup = await client.post("/api/auth/signup", json={
+            "email": "bench@example.com", "password": "bench-password", "name": "Bench User",
+        })
+        token = signup.json()["access_token"]
+
+        scenarios = build_scenarios(client, token, args)
+        results = []
+        for name in args.scenarios or list(scenarios):
+            print(f"running {name} ...", flush=True)
+            results.append(await bench_concurrent(name, scenarios[name], args.requests, args.concurrency,
+                                                  warmup=args.warmup))
+
+    await write_behind.stop()
+    await http_client.close()
+    analysis_pool.shutdown()
+    passwords.shutdown()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--scenarios", nargs="+", help="subset of scenarios to run (default: all)")
+    parser.add_argument("--requests", type=int, default=200, help="requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=16, help="requests in flight")
+    parser.add_argument("--warmup", type=int, default=3, help="untimed requests before each scenario")
+    parser.add_argument("--pages", type=int, default=2, help="synthetic resume size in pages")
+    parser.add_argument("--mongo-latency-ms", type=float, default=0.0, help="simulated MongoDB round trip")
+    parser.add_argument("--upstream-latency-ms", type=float, default=0.0, help="simulated provider latency")
+    parser.add_argument("--bcrypt-rounds", type=int, default=4, help="work factor for the login scenario")
+    add_baseline_args(parser)
+    args = parser.parse_args()
+
+    finish(args, asyncio.run(run(args)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Micro-benchmarks of the backend's hot functions on synthetic resumes.
+
+    python -m benchmarks.bench_hot_paths                          # default sizes and iterations
+    python -m benchmarks.bench_hot_paths --pages 1 10 --iterations 200
+    python -m benchmarks.bench_hot_paths --save-baseline bench_hot.json
+    python -m benchmarks.bench_hot_paths --baseline bench_hot.json --tolerance 0.2
+
+Times, in-process and single-threaded: extract_text_from_pdf and
+analyze_resume per resume size, then predict_resume_score,
+predict_career_success (single and batched), recommend_courses and
+generate_learning_path. Each row reports ops/sec, p50/p99 and mean; with
+--baseline the script exits 1 if any p99 grew or throughput fell by more
+than --tolerance.
+"""
+import argparse
+import io
+import random
+
+import ml_model
+import nlp_utils
+from model_registry import ModelNotAvailable
+from recommendation_engine import generate_learning_path, get_course_index, recommend_courses
+
+from benchmarks.harness import add_baseline_args, bench, finish
+from benchmarks.resumes import make_resume, make_pdf
+
+ROLES = ["software_engineer", "data_scientist", "frontend_developer", "devops_engineer", "ml_engineer"]
+
+
+def cycle(values):
+    """fn() helper: each call returns the next value, round-robin"""
+    state = {"i": -1}
+
+    def next_value():
+        state["i"] = (state["i"] + 1) % len(values)
+        return values[state["i"]]
+    return next_value
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--pages", type=int, nargs="+", default=[1, 5, 20], help="resume sizes in pages")
+    parser.add_argument("--iterations", type=int, default=100, help="timed calls per benchmark")
+    parser.add_argument("--variants", type=int, default=10, help="distinct synthetic inputs per benchmark")
+    parser.add_argument("--batch", type=int, default=64, help="rows per batched prediction")
+    add_baseline_args(parser)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    nlp_utils.preload()
+    get_course_index()
+    try:
+        ml_model.load_models()
+        have_models = True
+    except ModelNotAvailable as e:
+        print(f"Skipping model benchmarks ({e}); run `python train_model.py` first")
+        have_models = False
+
+    results = []
+    for pages in args.pages:
+        texts = [make_resume(seed, pages) for seed in range(args.variants)]
+        pdfs = [make_pdf(text) for text in texts]
+        iterations = max(10, args.iterations // pages)
+        next_pdf, next_text = cycle(pdfs), cycle(texts)
+        results.append(bench(f"extract_text_from_pdf[{pages}p]",
+                             lambda: nlp_utils.extract_text_from_pdf(io.BytesIO(next_pdf())), iterations))
+        results.append(bench(f"analyze_resume[{pages}p]", lambda: nlp_utils.analyze_resume(next_text()), iterations))
+
+    if have_models:
+        features = cycle([nlp_utils.extract_resume_features(make_resume(seed)) for seed in range(args.variants)])
+        results.append(bench("predict_resume_score", lambda: ml_model.predict_resume_score(features()), args.iterations))
+
+        profiles = [[rng.randint(21, 45), rng.randint(0, 15), rng.randint(1, 3), rng.randint(1, 15),
+                     rng.randint(1, 3), rng.randint(0, 6)] for _ in range(max(args.variants, args.batch))]
+        profile = cycle(profiles)
+        results.append(bench("predict_career_success", lambda: ml_model.predict_career_success(*profile()),
+                             args.iterations))
+        batch = profiles[:args.batch]
+        results.append(bench(f"predict_career_success_batch[{args.batch}]",
+                             lambda: ml_model.predict_career_success_batch(batch), args.iterations))
+
+    skill_sets = [rng.sample(nlp_utils.COMMON_SKILLS, rng.randint(1, 6)) for _ in range(args.variants)]
+    pair = cycle([(skills, rng.sample(nlp_utils.COMMON_SKILLS, 5)) for skills in skill_sets])
+    results.append(bench("recommend_courses", lambda: recommend_courses(*pair()), args.iterations))
+    path_input = cycle([(skills, rng.choice(ROLES)) for skills in skill_sets])
+    results.append(bench("generate_learning_path", lambda: generate_learning_path(*path_input()), args.iterations))
+
+    finish(args, results)
+
+
+if __name__ == "__main__":
+    main()
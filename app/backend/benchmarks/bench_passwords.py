@@ -0,0 +1,88 @@
+"""
+Benchmark password verification (the CPU cost of a login) through passwords.py.
+
+    python -m benchmarks.bench_passwords                      # cost 10-12, 1 worker and all cores
+    python -m benchmarks.bench_passwords --rounds 12 --workers 1 2 4 --logins 64
+
+For each work factor and pool size it runs --logins concurrent
+verify_password() calls on one event loop and reports logins/sec,
+logins/sec per worker thread, p50/p99 latency and the worst event-loop
+stall seen meanwhile (which should stay near zero now that bcrypt runs
+off the loop). The admission limit is raised to --logins so every login
+is measured; --max-pending keeps the server's limit instead, and logins
+turned away with HasherSaturated are then counted as rejected.
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import time
+
+import passwords
+
+
+async def _loop_stall(stop):
+    """Largest delay of a 5 ms ticker while the benchmark runs"""
+    worst = 0.0
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(0.005)
+        worst = max(worst, time.perf_counter() - started - 0.005)
+    return worst
+
+
+async def run_case(rounds, workers, logins, max_pending=None, password="correct horse battery staple"):
+    passwords.configure(rounds=rounds, workers=workers, max_pending=max_pending or logins)
+    stored = await passwords.hash_password(password)
+
+    async def login():
+        started = time.perf_counter()
+        try:
+            valid, _ = await passwords.verify_password(password, stored)
+        except passwords.HasherSaturated:
+            return None
+        assert valid
+        return time.perf_counter() - started
+
+    stop = asyncio.Event()
+    ticker = asyncio.ensure_future(_loop_stall(stop))
+    started = time.perf_counter()
+    outcomes = await asyncio.gather(*(login() for _ in range(logins)))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    stall = await ticker
+    passwords.shutdown()
+
+    latencies = sorted(latency for latency in outcomes if latency is not None)
+    return {
+        "rounds": rounds,
+        "workers": workers,
+        "rejected": logins - len(latencies),
+        "logins_per_sec": len(latencies) / elapsed,
+        "per_worker": len(latencies) / elapsed / workers,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p99_ms": latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000,
+        "loop_stall_ms": stall * 1000,
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rounds", type=int, nargs="+", default=[10, 11, 12], help="bcrypt work factors")
+    parser.add_argument("--workers", type=int, nargs="+", default=sorted({1, os.cpu_count() or 1}),
+                        help="hashing pool sizes")
+    parser.add_argument("--logins", type=int, default=32, help="concurrent logins per case")
+    parser.add_argument("--max-pending", type=int,
+                        help="hash jobs admitted at once (default: --logins; the server uses workers x 16)")
+    args = parser.parse_args()
+
+    print(f"{'rounds':>6} {'workers':>7} {'rejected':>8} {'logins/s':>9} {'per core':>9} {'p50 ms':>8} {'p99 ms':>8} {'loop stall ms':>13}")
+    for rounds in args.rounds:
+        for workers in args.workers:
+            r = await run_case(rounds, workers, args.logins, args.max_pending)
+            print(f"{r['rounds']:>6} {r['workers']:>7} {r['rejected']:>8} {r['logins_per_sec']:>9.1f} {r['per_worker']:>9.1f} "
+                  f"{r['p50_ms']:>8.1f} {r['p99_ms']:>8.1f} {r['loop_stall_ms']:>13.1f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
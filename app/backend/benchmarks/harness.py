@@ -0,0 +1,130 @@
+"""Timing, reporting and baseline/regression helpers shared by the benchmark scripts."""
+import asyncio
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+
+# Returned by a load-test request that the app turned away on purpose (429 + Retry-After)
+REJECTED = "rejected"
+
+
+def percentile(samples, q):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def summarize(name, latencies, elapsed, errors=0, rejected=0):
+    """Result row: ops/sec over the wall time plus p50/p99/mean latency in ms"""
+    return {
+        "name": name,
+        "n": len(latencies),
+        "errors": errors,
+        "rejected": rejected,
+        "throughput": len(latencies) / elapsed if elapsed else 0.0,
+        "p50_ms": percentile(latencies, 0.5) * 1000 if latencies else 0.0,
+        "p99_ms": percentile(latencies, 0.99) * 1000 if latencies else 0.0,
+        "mean_ms": statistics.fmean(latencies) * 1000 if latencies else 0.0,
+    }
+
+
+def bench(name, fn, iterations, warmup=3):
+    """Call fn() `iterations` times after `warmup` untimed calls"""
+    for _ in range(warmup):
+        fn()
+    latencies = []
+    started = time.perf_counter()
+    for _ in range(iterations):
+        call_started = time.perf_counter()
+        fn()
+        latencies.append(time.perf_counter() - call_started)
+    return summarize(name, latencies, time.perf_counter() - started)
+
+
+async def bench_concurrent(name, fn, requests, concurrency, warmup=0):
+    """
+    Await fn(i) for i in range(requests) with at most `concurrency` in flight.
+
+    fn returns True on success and REJECTED when the app shed the request
+    (429); False or an exception counts as an error. Only successes enter
+    the latency percentiles and the throughput.
+    """
+    for i in range(warmup):
+        await fn(-1 - i)
+
+    latencies, errors, rejected = [], 0, 0
+    next_index = 0
+
+    async def worker():
+        nonlocal next_index, errors, rejected
+        while next_index < requests:
+            index = next_index
+            next_index += 1
+            call_started = time.perf_counter()
+            try:
+                ok = await fn(index)
+            except Exception as e:
+                print(f"  {name}: {type(e).__name__}: {e}", file=sys.stderr)
+                ok = False
+            if ok == REJECTED:
+                rejected += 1
+            elif ok:
+                latencies.append(time.perf_counter() - call_started)
+            else:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(min(concurrency, requests))))
+    return summarize(name, latencies, time.perf_counter() - started, errors, rejected)
+
+
+def print_table(results):
+    print(f"{'benchmark':<32} {'n':>6} {'errors':>6} {'rejected':>8} {'ops/s':>10} {'p50 ms':>9} {'p99 ms':>9} {'mean ms':>9}")
+    for r in results:
+        print(f"{r['name']:<32} {r['n']:>6} {r['errors']:>6} {r['rejected']:>8} {r['throughput']:>10.1f} "
+              f"{r['p50_ms']:>9.2f} {r['p99_ms']:>9.2f} {r['mean_ms']:>9.2f}")
+
+
+# -------------------- BASELINES --------------------
+def add_baseline_args(parser):
+    parser.add_argument("--json", type=Path, help="also write the results to this JSON file")
+    parser.add_argument("--baseline", type=Path, help="compare against results saved with --save-baseline")
+    parser.add_argument("--save-baseline", type=Path, help="write these results as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="allowed p99 increase / throughput drop vs the baseline (default: 0.25)")
+
+
+def regressions(results, baseline, tolerance):
+    """Messages for every result that is slower than its baseline beyond the tolerance, or has errors"""
+    found = []
+    previous = {r["name"]: r for r in baseline}
+    for r in results:
+        if r["errors"]:
+            found.append(f"{r['name']}: {r['errors']} error(s)")
+        old = previous.get(r["name"])
+        if old is None:
+            continue
+        if r["p99_ms"] > old["p99_ms"] * (1 + tolerance):
+            found.append(f"{r['name']}: p99 {r['p99_ms']:.2f} ms vs baseline {old['p99_ms']:.2f} ms")
+        if r["throughput"] < old["throughput"] * (1 - tolerance):
+            found.append(f"{r['name']}: {r['throughput']:.1f} ops/s vs baseline {old['throughput']:.1f} ops/s")
+    return found
+
+
+def finish(args, results):
+    """Print the table, save/compare baselines; exit 1 on regressions"""
+    print_table(results)
+    if args.json:
+        args.json.write_text(json.dumps(results, indent=2))
+    if args.save_baseline:
+        args.save_baseline.write_text(json.dumps(results, indent=2))
+        print(f"\nSaved baseline to {args.save_baseline}")
+    if args.baseline:
+        found = regressions(results, json.loads(args.baseline.read_text()), args.tolerance)
+        if found:
+            print(f"\n{len(found)} regression(s) against {args.baseline} (tolerance {args.tolerance:.0%}):")
+            for message in found:
+                print(f"  {message}")
+            sys.exit(1)
+        print(f"\nNo regressions against {args.baseline} (tolerance {args.tolerance:.0%})")
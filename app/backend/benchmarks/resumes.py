@@ -0,0 +1,120 @@
+"""
+Synthetic resumes for the benchmarks: seeded, so every run scores the same documents.
+
+    python -m benchmarks.resumes out/ --sizes 1 5 20    # write resume_<pages>p.pdf files
+
+make_resume() returns plain text; make_pdf() lays text out on PDF pages
+with the standard Helvetica font, so no PDF library is needed to build
+inputs for extract_text_from_pdf.
+"""
+import argparse
+import random
+from pathlib import Path
+
+from nlp_utils import COMMON_SKILLS
+
+LINES_PER_PAGE = 60
+
+FIRST_NAMES = ["Asha", "Rahul", "Maya", "Arjun", "Priya", "Dev", "Neha", "Kabir", "Sara", "Ishan"]
+LAST_NAMES = ["Sharma", "Iyer", "Khan", "Patel", "Das", "Menon", "Rao", "Singh", "Gupta", "Nair"]
+TITLES = ["Software Engineer", "Data Scientist", "Backend Developer", "ML Engineer", "Full Stack Developer"]
+COMPANIES = ["Infosys", "Flipkart", "Zoho", "Razorpay", "Swiggy", "TCS", "Freshworks", "Ola"]
+VERBS = ["Led", "Built", "Optimized", "Designed", "Developed", "Implemented", "Improved", "Managed", "Created"]
+OBJECTS = ["a payments API", "the data pipeline", "an internal dashboard", "search ranking",
+           "the recommendation service", "CI/CD workflows", "a reporting module", "the mobile backend"]
+OUTCOMES = ["reducing latency by {n}%", "serving {n}k daily users", "cutting costs by {n}%",
+            "for a team of {n} engineers", "improving accuracy by {n}%", "across {n} regions"]
+DEGREES = ["B.Tech in Computer Science", "M.Sc in Data Science", "B.E. in Information Technology"]
+
+
+def make_resume(seed=0, pages=1):
+    """Plain-text resume of roughly `pages` pages (LINES_PER_PAGE lines each)"""
+    rng = random.Random(seed)
+    skills = rng.sample(COMMON_SKILLS, rng.randint(4, 10))
+    lines = [
+        f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+        rng.choice(TITLES),
+        f"Email: candidate{seed}@example.com | Phone: +91 98{rng.randint(10000000, 99999999)}",
+        "",
+        "Summary:",
+        f"{rng.choice(TITLES)} with {rng.randint(1, 12)} years of experience in {', '.join(skills[:3])}.",
+        "",
+        "Skills:",
+        ", ".join(skills),
+        "",
+        "Experience:",
+    ]
+    target = max(1, pages) * LINES_PER_PAGE - 10
+    while len(lines) < target:
+        lines.append(f"{rng.choice(TITLES)} at {rng.choice(COMPANIES)} ({rng.randint(2012, 2024)})")
+        for _ in range(rng.randint(3, 6)):
+            outcome = rng.choice(OUTCOMES).format(n=rng.randint(2, 60))
+            lines.append(f"- {rng.choice(VERBS)} {rng.choice(OBJECTS)} using {rng.choice(skills)}, {outcome}")
+        lines.append("")
+    lines += [
+        "Projects:",
+        f"- {rng.choice(VERBS)} {rng.choice(OBJECTS)} with {rng.choice(skills)} and {rng.choice(skills)}",
+        "",
+        "Education:",
+        f"{rng.choice(DEGREES)}, {rng.randint(2008, 2022)}",
+    ]
+    return "\n".join(lines)
+
+
+def _escape(line):
+    return line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def make_pdf(text, lines_per_page=LINES_PER_PAGE):
+    """Minimal PDF (bytes) showing `text`, lines_per_page lines per A4 page"""
+    lines = text.splitlines() or [""]
+    pages = [lines[i:i + lines_per_page] for i in range(0, len(lines), lines_per_page)]
+
+    # 1: catalog, 2: page tree, 3: font, then a (page, content stream) pair per page
+    objects = [b"<< /Type /Catalog /Pages 2 0 R >>", None,
+               b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    kids = []
+    for page_lines in pages:
+        stream = "BT /F1 10 Tf 12 TL 40 800 Td\n" + "".join(f"({_escape(l)}) Tj T*\n" for l in page_lines) + "ET"
+        stream = stream.encode("latin-1", "replace")
+        page_number = len(objects) + 1
+        kids.append(f"{page_number} 0 R")
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {page_number + 1} 0 R >>".encode()
+        )
+        objects.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream))
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {len(kids)} >>".encode()
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return bytes(out)
+
+
+def make_resume_pdf(seed=0, pages=1):
+    return make_pdf(make_resume(seed, pages))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("out", type=Path, help="directory to write the PDFs to")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 5, 20], help="page counts")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    args.out.mkdir(parents=True, exist_ok=True)
+    for pages in args.sizes:
+        path = args.out / f"resume_{pages}p.pdf"
+        path.write_bytes(make_resume_pdf(args.seed, pages))
+        print("Wrote", path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,183 @@
+"""
+Local stand-ins for MongoDB and the HTTP providers, for driving the app without network access.
+
+install_mongo() points every module that holds a collection at in-memory
+FakeCollections; install_providers() routes Adzuna, YouTube, RapidAPI and
+Lyzr through an httpx.MockTransport. Both take an optional simulated
+latency so the load test can model a remote database / upstream.
+"""
+import asyncio
+import json
+from datetime import datetime
+from types import SimpleNamespace
+from urllib.parse import parse_qs
+
+import httpx
+from bson import ObjectId
+
+
+def _matches(doc, query):
+    for field, condition in query.items():
+        value = doc.get(field)
+        if isinstance(condition, dict) and condition and all(k.startswith("$") for k in condition):
+            for op, operand in condition.items():
+                if op == "$exists" and (field in doc) != bool(operand):
+                    return False
+                if op == "$gte" and (value is None or value < operand):
+                    return False
+                if op == "$in" and value not in operand:
+                    return False
+        elif value != condition:
+            return False
+    return True
+
+
+class FakeCollection:
+    """The subset of motor's AsyncIOMotorCollection the backend uses, kept in a list"""
+
+    def __init__(self, name, latency=0.0):
+        self.name = name
+        self.latency = latency
+        self.docs = []
+
+    async def _round_trip(self):
+        await asyncio.sleep(self.latency)
+
+    async def insert_one(self, doc):
+        await self._round_trip()
+        doc.setdefault("_id", ObjectId())
+        self.docs.append(doc)
+        return SimpleNamespace(inserted_id=doc["_id"])
+
+    async def insert_many(self, docs, ordered=True):
+        await self._round_trip()
+        for doc in docs:
+            doc.setdefault("_id", ObjectId())
+        self.docs.extend(docs)
+        return SimpleNamespace(inserted_ids=[doc["_id"] for doc in docs])
+
+    async def find_one(self, query=None, projection=None, sort=None):
+        await self._round_trip()
+        found = [doc for doc in self.docs if _matches(doc, query or {})]
+        for field, direction in reversed(sort or []):
+            found.sort(key=lambda doc: doc.get(field) or datetime.min, reverse=direction < 0)
+        return dict(found[0]) if found else None
+
+    async def update_one(self, query, update, upsert=False):
+        await self._round_trip()
+        doc = next((doc for doc in self.docs if _matches(doc, query)), None)
+        if doc is None:
+            if not upsert:
+                return SimpleNamespace(matched_count=0)
+            doc = dict(query)
+            doc.update(update.get("$setOnInsert", {}))
+            self.docs.append(doc)
+        doc.update(update.get("$set", {}))
+        for field, delta in update.get("$inc", {}).items():
+            doc[field] = doc.get(field, 0) + delta
+        return SimpleNamespace(matched_count=1)
+
+    async def count_documents(self, query):
+        await self._round_trip()
+        return sum(1 for doc in self.docs if _matches(doc, query))
+
+    async def estimated_document_count(self):
+        await self._round_trip()
+        return len(self.docs)
+
+    async def create_index(self, keys, **options):
+        return options.get("name", "_".join(f"{field}_{direction}" for field, direction in keys))
+
+
+def install_mongo(latency=0.0):
+    """Swap the collections in database, server, counters and write_behind for FakeCollections"""
+    import counters
+    import database
+    import server
+    import write_behind
+
+    collections = {name: FakeCollection(name, latency) for name in ("users", "resume_analyses", "predictions", "counters")}
+    database.users_collection = server.users_collection = collections["users"]
+    database.resume_collection = server.resume_collection = collections["resume_analyses"]
+    database.predictions_collection = collections["predictions"]
+    counters.counters_collection = collections["counters"]
+    counters.COUNTED = {
+        "predictions_made": collections["predictions"],
+        "resumes_analyzed": collections["resume_analyses"],
+        "users": collections["users"],
+    }
+    write_behind.predictions_buffer.collection = collections["predictions"]
+    write_behind.resume_buffer.collection = collections["resume_analyses"]
+    return collections
+
+
+# -------------------- HTTP PROVIDERS --------------------
+def _adzuna(request):
+    query = parse_qs(request.url.query.decode()).get("what", ["developer"])[0]
+    count = int(parse_qs(request.url.query.decode()).get("results_per_page", ["6"])[0])
+    return {"results": [
+        {
+            "title": f"{query.title()} Engineer {i}",
+            "description": f"Looking for {query} experience, APIs, cloud and testing. " * 3,
+            "company": {"display_name": f"Company {i}"},
+            "location": {"display_name": "Bengaluru"},
+            "salary_min": 800000 + i * 10000,
+            "salary_max": 1500000 + i * 10000,
+            "redirect_url": f"https://example.com/jobs/{i}",
+        }
+        for i in range(count)
+    ]}
+
+
+def _youtube(request):
+    query = parse_qs(request.url.query.decode()).get("q", ["course"])[0]
+    return {"items": [
+        {"id": {"videoId": f"vid{i}"}, "snippet": {"title": f"{query} part {i}", "thumbnails": {}}}
+        for i in range(4)
+    ]}
+
+
+def _udemy(request):
+    query = parse_qs(request.url.query.decode()).get("query", ["course"])[0]
+    return {"courses": [
+        {"title": f"{query} masterclass {i}", "price": "12.99", "url": f"/course/{query}-{i}/"}
+        for i in range(6)
+    ]}
+
+
+def _lyzr_stream():
+    async def body():
+        for token in ["Focus ", "on ", "measurable ", "impact."]:
+            yield f"data: {token}\n\n".encode()
+    return httpx.Response(200, content=body(), headers={"content-type": "text/event-stream"})
+
+
+def provider_transport(latency=0.0):
+    """MockTransport answering like the four providers, after `latency` seconds"""
+    async def handler(request):
+        await asyncio.sleep(latency)
+        host, path = request.url.host, request.url.path
+        if "adzuna" in host:
+            return httpx.Response(200, json=_adzuna(request))
+        if "googleapis" in host:
+            return httpx.Response(200, json=_youtube(request))
+        if "rapidapi" in host:
+            return httpx.Response(200, json=_udemy(request))
+        if "lyzr" in host and "stream" in path:
+            return _lyzr_stream()
+        if "lyzr" in host:
+            return httpx.Response(200, json={"response": json.dumps({"result": {"message": "Focus on measurable impact."}})})
+        return httpx.Response(404)
+    return httpx.MockTransport(handler)
+
+
+def install_providers(latency=0.0):
+    """Route every outbound call to provider_transport() and give each provider dummy credentials"""
+    import chat
+    import http_client
+    import recommendation_engine
+
+    http_client.configure(provider_transport(latency))
+    recommendation_engine.ADZUNA_APP_ID = recommendation_engine.ADZUNA_APP_KEY = "bench"
+    recommendation_engine.YOUTUBE_API_KEY = recommendation_engine.RAPIDAPI_KEY = "bench"
+    chat.LYZR_API_KEY = chat.LYZR_AGENT_ID = "bench"
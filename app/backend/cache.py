@@ -0,0 +1,237 @@
+import asyncio
+import functools
+import logging
+import os
+import time
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+# -------------------- CONFIGURATION --------------------
+# CACHE_BACKEND=memory keeps everything in-process; "mongo" adds MongoDB as a
+# shared second tier so workers and restarts reuse each other's results
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "memory").lower()
+CACHE_MAXSIZE = int(os.getenv("CACHE_MAXSIZE", "1024"))
+CACHE_STALE_TTL = float(os.getenv("CACHE_STALE_TTL", "3600"))
+CACHE_NEGATIVE_TTL = float(os.getenv("CACHE_NEGATIVE_TTL", "60"))
+CACHE_COLLECTION = os.getenv("CACHE_COLLECTION", "api_cache")
+
+FRESH = "fresh"
+STALE = "stale"
+MISS = "miss"
+
+_caches = {}
+
+
+class TTLCache:
+    """In-process LRU cache whose entries expire after a TTL, with an optional stale window"""
+
+    def __init__(self, name, maxsize=CACHE_MAXSIZE, ttl=300, stale_ttl=0):
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self._data = OrderedDict()
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        _caches[name] = self
+
+    def lookup(self, key, now=None):
+        """Return (value, state) where state is FRESH, STALE or MISS"""
+        entry = self._data.get(key)
+        if entry is None:
+            self.misses += 1
+            return None, MISS
+
+        value, expires_at, stale_until = entry
+        now = time.monotonic() if now is None else now
+        if now < expires_at:
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value, FRESH
+        if now < stale_until:
+            self._data.move_to_end(key)
+            self.stale_hits += 1
+            return value, STALE
+
+        del self._data[key]
+        self.misses += 1
+        return None, MISS
+
+    def get(self, key, default=None):
+        value, state = self.lookup(key)
+        return value if state == FRESH else default
+
+    def set(self, key, value, ttl=None, stale_ttl=None):
+        now = time.monotonic()
+        ttl = self.ttl if ttl is None else ttl
+        stale_ttl = self.stale_ttl if stale_ttl is None else stale_ttl
+        self._data[key] = (value, now + ttl, now + ttl + stale_ttl)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def delete(self, key):
+        self._data.pop(key, None)
+
+    def clear(self):
+        self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+    def stats(self):
+        lookups = self.hits + self.stale_hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": round((self.hits + self.stale_hits) / lookups, 4) if lookups else 0.0,
+        }
+
+
+class MongoCacheBackend:
+    """Shared second cache tier stored in a MongoDB collection"""
+
+    def __init__(self, collection_name=CACHE_COLLECTION):
+        self.collection_name = collection_name
+        self._collection = None
+
+    @property
+    def collection(self):
+        if self._collection is None:
+            from database import db
+            self._collection = db[self.collection_name]
+        return self._collection
+
+    async def get(self, key):
+        """Return (value, fresh_seconds_left, stale_seconds_left) or None"""
+        doc = await self.collection.find_one({"_id": key})
+        if not doc:
+            return None
+        now = time.time()
+        if doc["stale_until"] <= now:
+            return None
+        return doc["value"], doc["expires_at"] - now, doc["stale_until"] - now
+
+    async def set(self, key, value, ttl, stale_ttl):
+        now = time.time()
+        await self.collection.replace_one(
+            {"_id": key},
+            {"_id": key, "value": value, "expires_at": now + ttl, "stale_until": now + ttl + stale_ttl},
+            upsert=True,
+        )
+
+
+def _default_backend():
+    if CACHE_BACKEND == "mongo":
+        return MongoCacheBackend()
+    return None
+
+
+def _is_empty(value):
+    return not value
+
+
+def cached(name, key, ttl, stale_ttl=CACHE_STALE_TTL, negative_ttl=CACHE_NEGATIVE_TTL,
+           is_negative=_is_empty, backend="default"):
+    """
+    Cache the result of an async function under key(*args, **kwargs).
+
+    - fresh entries are returned directly
+    - stale entries are returned immediately and refreshed in the background
+    - negative results (failures / empty responses) are kept for negative_ttl only
+    - concurrent misses for the same key share a single upstream call
+    """
+    cache = TTLCache(name, ttl=ttl, stale_ttl=stale_ttl)
+    if backend == "default":
+        backend = _default_backend()
+    inflight = {}
+    background = set()
+
+    def _finish_background(task):
+        background.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning("Background refresh failed for %s: %s", name, task.exception())
+
+    def decorator(fn):
+        async def load(cache_key, args, kwargs, previous=None):
+            value = await fn(*args, **kwargs)
+            if is_negative(value):
+                if previous is not None:
+                    # Upstream failed during revalidation: keep serving the stale result a while longer
+                    cache.set(cache_key, previous, ttl=0, stale_ttl=negative_ttl)
+                    return previous
+                cache.set(cache_key, value, ttl=negative_ttl, stale_ttl=0)
+                return value
+            cache.set(cache_key, value)
+            if backend is not None:
+                try:
+                    await backend.set(cache_key, value, ttl, stale_ttl)
+                except Exception as e:
+                    logger.warning("Cache backend write failed for %s: %s", cache_key, e)
+            return value
+
+        def start_load(cache_key, args, kwargs, previous=None):
+            task = inflight.get(cache_key)
+            if task is None:
+                task = asyncio.ensure_future(load(cache_key, args, kwargs, previous))
+                inflight[cache_key] = task
+                task.add_done_callback(lambda _: inflight.pop(cache_key, None))
+            return task
+
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            cache_key = key(*args, **kwargs)
+            value, state = cache.lookup(cache_key)
+            if state == FRESH:
+                return value
+            if state == STALE:
+                if cache_key not in inflight:
+                    task = start_load(cache_key, args, kwargs, previous=value)
+                    background.add(task)
+                    task.add_done_callback(_finish_background)
+                return value
+
+            if backend is not None:
+                try:
+                    found = await backend.get(cache_key)
+                except Exception as e:
+                    logger.warning("Cache backend read failed for %s: %s", cache_key, e)
+                    found = None
+                if found is not None:
+                    value, fresh_left, stale_left = found
+                    if fresh_left > 0:
+                        cache.set(cache_key, value, ttl=fresh_left, stale_ttl=stale_left - fresh_left)
+                        return value
+                    cache.set(cache_key, value, ttl=0, stale_ttl=stale_left)
+                    task = start_load(cache_key, args, kwargs, previous=value)
+                    background.add(task)
+                    task.add_done_callback(_finish_background)
+                    return value
+
+            return await asyncio.shield(start_load(cache_key, args, kwargs))
+
+        wrapper.cache = cache
+        return wrapper
+
+    return decorator
+
+
+def normalize_text(value):
+    """Lowercase and collapse whitespace so equivalent queries share a cache key"""
+    return " ".join(str(value or "").lower().split())
+
+
+def get_cache(name):
+    return _caches.get(name)
+
+
+def all_stats():
+    return {name: cache.stats() for name, cache in _caches.items()}
@@ -0,0 +1,234 @@
+import asyncio
+import json
+import logging
+import os
+import re
+import time
+from collections import deque
+
+import httpx
+
+import http_client
+
+logger = logging.getLogger(__name__)
+
+# -------------------- CONFIGURATION --------------------
+LYZR_API_KEY = os.getenv("LYZR_API_KEY")
+LYZR_AGENT_ID = os.getenv("LYZR_AGENT_ID")
+LYZR_CHAT_URL = os.getenv("LYZR_CHAT_URL", "https://agent-prod.studio.lyzr.ai/v3/inference/chat/")  # trailing slash required
+LYZR_STREAM_URL = os.getenv("LYZR_STREAM_URL", "https://agent-prod.studio.lyzr.ai/v3/inference/stream/")
+# Whole-reply budget for the upstream agent (seconds)
+CHAT_TIMEOUT = float(os.getenv("CHAT_TIMEOUT", "15"))
+# A stream whose first token takes longer than this gets the keyword fallback instead
+CHAT_FIRST_TOKEN_TIMEOUT = float(os.getenv("CHAT_FIRST_TOKEN_TIMEOUT", "2.5"))
+# Recent time-to-first-byte samples kept per mode for stats()
+CHAT_TTFB_SAMPLES = int(os.getenv("CHAT_TTFB_SAMPLES", "1024"))
+
+LYZR = "lyzr"
+FALLBACK = "fallback"
+
+# -------------------- FALLBACK REPLIES --------------------
+# Used when Lyzr is unavailable or slow; the first key (in this order) found in the message wins
+DEMO_REPLIES = {
+    "hello": "Hi there! 👋 I'm your AI Career Advisor. Ask me about resumes, interviews, salary negotiation, or career growth!",
+    "hi":    "Hello! 😊 How can I help with your career today?",
+    "resume": "To improve your resume: 1) Use quantifiable achievements, 2) Add keywords from job descriptions, 3) Use clear sections (Summary, Experience, Skills, Education), 4) Start bullets with action verbs like 'Led', 'Built', 'Optimized'.",
+    "interview": "For interviews: 1) Research the company, 2) Use the STAR method, 3) Prepare achievement examples, 4) Ask thoughtful questions, 5) Send a follow-up thank-you email.",
+    "salary": "Salary tips: 1) Research market rates, 2) Negotiate after the offer, 3) Consider total compensation, 4) Get agreements in writing.",
+    "career": "Career growth: 1) Set clear milestones, 2) Build skills via courses, 3) Network in your field, 4) Find a mentor, 5) Take on stretch projects.",
+    "skill":  "Top skills in 2025: Python, React, AWS, SQL, Machine Learning, Communication, and Project Management.",
+    "job":    "Job search tips: 1) Tailor your resume per role, 2) Apply on company sites directly, 3) Network on LinkedIn, 4) Follow up after 1 week.",
+}
+DEFAULT_REPLY = "Great question! I can help with resume tips, interview prep, salary negotiation, and career growth. Could you be more specific?"
+
+_KEY_PRIORITY = {key: rank for rank, key in enumerate(DEMO_REPLIES)}
+# One pass over the message: the lookahead reports, at every position, the
+# highest-priority key starting there, so the overall minimum rank is the
+# same key the old "first k in demo_replies that is in message" loop picked
+_KEY_PATTERN = re.compile("(?=(" + "|".join(map(re.escape, DEMO_REPLIES)) + "))")
+
+
+def fallback_reply(message):
+    found = _KEY_PATTERN.findall(message.lower())
+    if not found:
+        return DEFAULT_REPLY
+    return DEMO_REPLIES[min(found, key=_KEY_PRIORITY.__getitem__)]
+
+
+# -------------------- METRICS --------------------
+_ttfb = {"json": deque(maxlen=CHAT_TTFB_SAMPLES), "stream": deque(maxlen=CHAT_TTFB_SAMPLES)}
+_replies = {(mode, source): 0 for mode in _ttfb for source in (LYZR, FALLBACK)}
+
+
+def _record(mode, source, started):
+    elapsed = time.perf_counter() - started
+    _ttfb[mode].append(elapsed)
+    _replies[(mode, source)] += 1
+    return elapsed
+
+
+def _percentile(samples, q):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def stats():
+    result = {}
+    for mode, samples in _ttfb.items():
+        result[mode] = {
+            "replies": {source: _replies[(mode, source)] for source in (LYZR, FALLBACK)},
+            "ttfb_p50_ms": round(_percentile(samples, 0.5) * 1000, 1) if samples else None,
+            "ttfb_p99_ms": round(_percentile(samples, 0.99) * 1000, 1) if samples else None,
+        }
+    return result
+
+
+# -------------------- LYZR --------------------
+def configured():
+    return bool(LYZR_API_KEY and LYZR_AGENT_ID)
+
+
+def _payload(message):
+    return {
+        "user_id": "careercraft-user",
+        "agent_id": LYZR_AGENT_ID,
+        "session_id": "careercraft-session",
+        "message": message,  # "message" not "input"
+    }
+
+
+def _headers():
+    return {"Content-Type": "application/json", "x-api-key": LYZR_API_KEY}
+
+
+def _parse_reply(data):
+    # Lyzr returns: {"response": "{\"result\": {\"message\": \"...\"}}", ...}
+    # The "response" field is a JSON STRING — parse it!
+    raw = data.get("response", "")
+    if not raw:
+        return None
+    try:
+        parsed = json.loads(raw)
+        return (
+            parsed.get("result", {}).get("message")
+            or parsed.get("message")
+            or parsed.get("output")
+            or raw
+        )
+    except (json.JSONDecodeError, AttributeError):
+        return raw  # use raw string if not parseable
+
+
+def _parse_event(data):
+    """Text carried by one SSE data field of the Lyzr stream ("" for control events)"""
+    if data == "[DONE]":
+        return ""
+    try:
+        parsed = json.loads(data)
+    except json.JSONDecodeError:
+        return data
+    if isinstance(parsed, dict):
+        return parsed.get("content") or parsed.get("delta") or parsed.get("message") or ""
+    return parsed if isinstance(parsed, str) else ""
+
+
+async def _lyzr_reply(message):
+    try:
+        response = await http_client.post(LYZR_CHAT_URL, json=_payload(message), headers=_headers(), timeout=CHAT_TIMEOUT,
+                                          provider="lyzr")
+        if response.status_code == 200:
+            reply = _parse_reply(response.json())
+            if reply:
+                logger.info("Lyzr API responded successfully")
+                return reply
+        else:
+            logger.warning(f"Lyzr returned {response.status_code}: {response.text[:200]}")
+    except http_client.CircuitOpenError:
+        logger.info("Lyzr circuit open — using fallback")
+    except httpx.ConnectError:
+        logger.warning("Lyzr DNS resolution failed — using fallback")
+    except httpx.TimeoutException:
+        logger.warning("Lyzr request timed out — using fallback")
+    except Exception as e:
+        logger.warning(f"Lyzr API error: {e}")
+    return None
+
+
+async def _lyzr_tokens(message, queue):
+    """Put each text chunk of the streamed Lyzr reply on queue, then None (also on failure)"""
+    try:
+        async with http_client.stream("POST", LYZR_STREAM_URL, json=_payload(message), headers=_headers(),
+                                      timeout=CHAT_TIMEOUT, provider="lyzr") as response:
+            if response.status_code != 200:
+                body = await response.aread()
+                logger.warning(f"Lyzr stream returned {response.status_code}: {body[:200]!r}")
+                return
+            async for line in response.aiter_lines():
+                if line.startswith("data:"):
+                    # SSE strips exactly one space after the colon; token text may start with more
+                    data = line[6:] if line.startswith("data: ") else line[5:]
+                    text = _parse_event(data)
+                    if text:
+                        await queue.put(text)
+    except http_client.CircuitOpenError:
+        logger.info("Lyzr circuit open — using fallback")
+    except httpx.ConnectError:
+        logger.warning("Lyzr DNS resolution failed — using fallback")
+    except httpx.TimeoutException:
+        logger.warning("Lyzr stream timed out")
+    except Exception as e:
+        logger.warning(f"Lyzr stream error: {e}")
+    finally:
+        await queue.put(None)
+
+
+# -------------------- REPLIES --------------------
+async def reply(message):
+    """Full reply for one message: Lyzr's answer, or the keyword fallback"""
+    started = time.perf_counter()
+    text = await _lyzr_reply(message) if configured() else None
+    _record("json", LYZR if text else FALLBACK, started)
+    return text or fallback_reply(message)
+
+
+def _sse(data, event=None):
+    prefix = f"event: {event}\n" if event else ""
+    return f"{prefix}data: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+async def stream_reply(message):
+    """
+    Server-sent events for one message.
+
+    Lyzr tokens are forwarded as `data: {"delta": ...}` events as they
+    arrive. If Lyzr is not configured, fails, or sends nothing within
+    CHAT_FIRST_TOKEN_TIMEOUT, the keyword fallback is sent as a single
+    delta instead. A final `event: done` carries the source and TTFB.
+    """
+    started = time.perf_counter()
+    source = FALLBACK
+    first = None
+    queue = asyncio.Queue()
+    producer = asyncio.ensure_future(_lyzr_tokens(message, queue)) if configured() else None
+    try:
+        if producer is not None:
+            try:
+                first = await asyncio.wait_for(queue.get(), timeout=CHAT_FIRST_TOKEN_TIMEOUT)
+            except asyncio.TimeoutError:
+                logger.warning(f"No Lyzr token within {CHAT_FIRST_TOKEN_TIMEOUT}s — using fallback")
+
+        if first is None:
+            ttfb = _record("stream", FALLBACK, started)
+            yield _sse({"delta": fallback_reply(message)})
+        else:
+            source = LYZR
+            ttfb = _record("stream", LYZR, started)
+            chunk = first
+            while chunk is not None:
+                yield _sse({"delta": chunk})
+                chunk = await queue.get()
+
+        yield _sse({"source": source, "ttfb_ms": round(ttfb * 1000, 1)}, event="done")
+    finally:
+        if producer is not None:
+            producer.cancel()
@@ -0,0 +1,172 @@
+import logging
+import os
+import time
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+# -------------------- CONFIGURATION --------------------
+# Rolling window of recent calls per provider: at most CB_WINDOW_SIZE calls from the last CB_WINDOW_SECONDS
+CB_WINDOW_SIZE = int(os.getenv("CB_WINDOW_SIZE", "100"))
+CB_WINDOW_SECONDS = float(os.getenv("CB_WINDOW_SECONDS", "60"))
+# The circuit opens when the window has CB_MIN_CALLS calls and CB_ERROR_RATE of them failed,
+# or after CB_CONSECUTIVE_FAILURES failures in a row
+CB_MIN_CALLS = int(os.getenv("CB_MIN_CALLS", "10"))
+CB_ERROR_RATE = float(os.getenv("CB_ERROR_RATE", "0.5"))
+CB_CONSECUTIVE_FAILURES = int(os.getenv("CB_CONSECUTIVE_FAILURES", "5"))
+# Seconds an open circuit rejects calls before letting a single probe through
+CB_OPEN_SECONDS = float(os.getenv("CB_OPEN_SECONDS", "30"))
+# Adaptive timeout: CB_TIMEOUT_MULTIPLIER x the window's p99 success latency, never below
+# CB_MIN_TIMEOUT nor above the caller's timeout, once CB_MIN_SAMPLES successes are known
+CB_TIMEOUT_MULTIPLIER = float(os.getenv("CB_TIMEOUT_MULTIPLIER", "3"))
+CB_MIN_TIMEOUT = float(os.getenv("CB_MIN_TIMEOUT", "1"))
+CB_MIN_SAMPLES = int(os.getenv("CB_MIN_SAMPLES", "20"))
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+_breakers = {}
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a provider whose circuit is open; callers treat it like any upstream failure"""
+
+
+def _percentile(samples, q):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class CircuitBreaker:
+    """
+    Tracks one upstream provider's recent calls and decides whether to call it at all.
+
+    closed: calls go through, each recorded as (time, ok, latency).
+    open: calls fail fast with CircuitOpenError for CB_OPEN_SECONDS.
+    half_open: one probe call goes through; success closes the circuit
+    (with a fresh window), failure opens it again.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.state = CLOSED
+        self._window = deque(maxlen=CB_WINDOW_SIZE)
+        self._consecutive_failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self.calls = 0
+        self.failures = 0
+        self.rejected = 0
+        self.opened = 0
+        _breakers[name] = self
+
+    def _trim(self, now):
+        while self._window and now - self._window[0][0] > CB_WINDOW_SECONDS:
+            self._window.popleft()
+
+    def before_call(self):
+        """
+        Raise CircuitOpenError if the provider must not be called right now.
+
+        Returns True when this call is the half-open probe; pass that on to
+        record() and release().
+        """
+        if self.state == OPEN:
+            if time.monotonic() - self._opened_at < CB_OPEN_SECONDS:
+                self.rejected += 1
+                raise CircuitOpenError(f"{self.name} circuit is open")
+            self.state = HALF_OPEN
+            logger.info("%s circuit half-open, probing", self.name)
+        if self.state == HALF_OPEN:
+            if self._probing:
+                self.rejected += 1
+                raise CircuitOpenError(f"{self.name} circuit is half-open, probe in flight")
+            self._probing = True
+            return True
+        return False
+
+    def timeout(self, default):
+        """Per-call timeout: the caller's default, shortened to what this provider usually needs"""
+        latencies = [latency for _, ok, latency in self._window if ok]
+        if default is None or len(latencies) < CB_MIN_SAMPLES:
+            return default
+        return min(default, max(CB_MIN_TIMEOUT, _percentile(latencies, 0.99) * CB_TIMEOUT_MULTIPLIER))
+
+    def record(self, ok, latency, probe=False):
+        now = time.monotonic()
+        self.calls += 1
+        self._trim(now)
+        self._window.append((now, ok, latency))
+
+        if probe:
+            self._probing = False
+            if ok:
+                self.state = CLOSED
+                self._window.clear()
+                self._consecutive_failures = 0
+                logger.info("%s circuit closed after a successful probe", self.name)
+            else:
+                self.failures += 1
+                self._open(now, "probe failed")
+            return
+
+        if ok:
+            self._consecutive_failures = 0
+            return
+        self.failures += 1
+        if self.state != CLOSED:
+            # A late answer to a call made before the circuit opened
+            return
+        self._consecutive_failures += 1
+        errors = sum(1 for _, ok, _ in self._window if not ok)
+        if self._consecutive_failures >= CB_CONSECUTIVE_FAILURES:
+            self._open(now, f"{self._consecutive_failures} consecutive failures")
+        elif len(self._window) >= CB_MIN_CALLS and errors / len(self._window) >= CB_ERROR_RATE:
+            self._open(now, f"{errors}/{len(self._window)} recent calls failed")
+
+    def _open(self, now, reason):
+        if self.state != OPEN:
+            self.opened += 1
+            logger.warning("%s circuit opened (%s); failing fast for %.0fs", self.name, reason, CB_OPEN_SECONDS)
+        self.state = OPEN
+        self._opened_at = now
+
+    def release(self, probe):
+        """Free the probe slot of a probe call that ended without record() (e.g. cancelled)"""
+        if probe:
+            self._probing = False
+
+    def reset(self):
+        self.state = CLOSED
+        self._window.clear()
+        self._consecutive_failures = 0
+        self._probing = False
+
+    def stats(self):
+        self._trim(time.monotonic())
+        latencies = [latency for _, ok, latency in self._window if ok]
+        errors = sum(1 for _, ok, _ in self._window if not ok)
+        return {
+            "state": self.state,
+            "calls": self.calls,
+            "failures": self.failures,
+            "rejected": self.rejected,
+            "opened": self.opened,
+            "window_calls": len(self._window),
+            "window_error_rate": round(errors / len(self._window), 3) if self._window else 0.0,
+            "latency_p50_ms": round(_percentile(latencies, 0.5) * 1000, 1) if latencies else None,
+            "latency_p99_ms": round(_percentile(latencies, 0.99) * 1000, 1) if latencies else None,
+        }
+
+
+def get(name):
+    """The breaker for a provider, created on first use"""
+    breaker = _breakers.get(name)
+    if breaker is None:
+        breaker = CircuitBreaker(name)
+    return breaker
+
+
+def all_stats():
+    return {name: breaker.stats() for name, breaker in _breakers.items()}
@@ -0,0 +1,71 @@
+import logging
+import os
+
+from pymongo.errors import PyMongoError
+
+from cache import TTLCache
+from database import db, predictions_collection, resume_collection, users_collection
+
+logger = logging.getLogger(__name__)
+
+# -------------------- CONFIGURATION --------------------
+# How long (seconds) a dashboard counter snapshot is served before re-reading it
+DASHBOARD_CACHE_TTL = float(os.getenv("DASHBOARD_CACHE_TTL", "5"))
+
+counters_collection = db["counters"]
+DASHBOARD_ID = "dashboard"
+
+# Counter name -> collection whose inserts it tracks
+COUNTED = {
+    "predictions_made": predictions_collection,
+    "resumes_analyzed": resume_collection,
+    "users": users_collection,
+}
+
+_snapshot = TTLCache("dashboard_counters", maxsize=1, ttl=DASHBOARD_CACHE_TTL)
+
+
+async def increment(**deltas):
+    """$inc the dashboard counters, e.g. increment(predictions_made=3); call after a successful insert"""
+    deltas = {name: n for name, n in deltas.items() if n}
+    if not deltas:
+        return
+    try:
+        await counters_collection.update_one({"_id": DASHBOARD_ID}, {"$inc": deltas})
+    except PyMongoError as e:
+        logger.warning("Could not update dashboard counters: %s", e)
+
+
+async def _estimated_counts():
+    # Collection metadata, not a scan: O(1) whatever the collection size
+    return {name: await collection.estimated_document_count() for name, collection in COUNTED.items()}
+
+
+async def seed():
+    """Create the counters document from the current collection sizes if it does not exist yet"""
+    try:
+        await counters_collection.update_one(
+            {"_id": DASHBOARD_ID}, {"$setOnInsert": await _estimated_counts()}, upsert=True
+        )
+    except PyMongoError as e:
+        logger.warning("Could not seed dashboard counters: %s", e)
+
+
+async def read():
+    """Current {counter: value}, from a snapshot at most DASHBOARD_CACHE_TTL seconds old"""
+    counts = _snapshot.get(DASHBOARD_ID)
+    if counts is not None:
+        return counts
+
+    counts = dict.fromkeys(COUNTED, 0)
+    try:
+        doc = await counters_collection.find_one({"_id": DASHBOARD_ID})
+        if doc is None:
+            await seed()
+            doc = await counters_collection.find_one({"_id": DASHBOARD_ID}) or {}
+        counts.update({name: int(doc.get(name, 0)) for name in COUNTED})
+    except PyMongoError as e:
+        logger.warning("Could not read dashboard counters: %s", e)
+        return counts
+    _snapshot.set(DASHBOARD_ID, counts)
+    return counts
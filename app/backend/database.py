@@ -1,16 +1,71 @@
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ASCENDING, DESCENDING
+from pymongo.errors import PyMongoError, ServerSelectionTimeoutError
+from pathlib import Path
+import logging
 import os
 from dotenv import load_dotenv
 
-load_dotenv()
+load_dotenv(Path(__file__).parent / '.env')
+
+logger = logging.getLogger(__name__)
 
 MONGO_URL = os.getenv("MONGO_URL")
 DB_NAME = os.getenv("DB_NAME")
 
-# Create single MongoDB client
-client = AsyncIOMotorClient(MONGO_URL)
+# Connection pool / timeout tuning (per process)
+MONGO_MAX_POOL_SIZE = int(os.getenv("MONGO_MAX_POOL_SIZE", "50"))
+MONGO_MIN_POOL_SIZE = int(os.getenv("MONGO_MIN_POOL_SIZE", "0"))
+MONGO_MAX_IDLE_TIME_MS = int(os.getenv("MONGO_MAX_IDLE_TIME_MS", "300000"))
+MONGO_CONNECT_TIMEOUT_MS = int(os.getenv("MONGO_CONNECT_TIMEOUT_MS", "5000"))
+MONGO_SERVER_SELECTION_TIMEOUT_MS = int(os.getenv("MONGO_SERVER_SELECTION_TIMEOUT_MS", "5000"))
+MONGO_SOCKET_TIMEOUT_MS = int(os.getenv("MONGO_SOCKET_TIMEOUT_MS", "20000"))
+MONGO_WAIT_QUEUE_TIMEOUT_MS = int(os.getenv("MONGO_WAIT_QUEUE_TIMEOUT_MS", "5000"))
+# Wire compression; zlib needs no extra packages (snappy/zstd need python-snappy/zstandard)
+MONGO_COMPRESSORS = os.getenv("MONGO_COMPRESSORS", "zlib")
+
+# Create single MongoDB client, shared by every module in the process
+client = AsyncIOMotorClient(
+    MONGO_URL,
+    maxPoolSize=MONGO_MAX_POOL_SIZE,
+    minPoolSize=MONGO_MIN_POOL_SIZE,
+    maxIdleTimeMS=MONGO_MAX_IDLE_TIME_MS,
+    connectTimeoutMS=MONGO_CONNECT_TIMEOUT_MS,
+    serverSelectionTimeoutMS=MONGO_SERVER_SELECTION_TIMEOUT_MS,
+    socketTimeoutMS=MONGO_SOCKET_TIMEOUT_MS,
+    waitQueueTimeoutMS=MONGO_WAIT_QUEUE_TIMEOUT_MS,
+    compressors=MONGO_COMPRESSORS or None,
+    appname="careercraft-backend",
+)
 db = client[DB_NAME]
 
 # Collections (VERY IMPORTANT NAMES)
 users_collection = db["users"]
-resume_collection = db["resume_analyses"]
\ No newline at end of file
+resume_collection = db["resume_analyses"]
+predictions_collection = db["predictions"]
+
+# (collection, keys, options) created at startup by ensure_indexes()
+INDEXES = [
+    (users_collection, [("email", ASCENDING)], {"unique": True, "name": "email_unique"}),
+    (resume_collection, [("user_id", ASCENDING), ("created_at", DESCENDING)], {"name": "user_recent"}),
+    (predictions_collection, [("user_id", ASCENDING), ("created_at", DESCENDING)], {"name": "user_recent"}),
+    # Duplicate-upload lookups only need the documents that carry a stored result
+    (resume_collection, [("content_hash", ASCENDING), ("model_version", ASCENDING), ("created_at", DESCENDING)],
+     {"name": "content_hash_recent", "partialFilterExpression": {"result": {"$exists": True}}}),
+    (resume_collection, [("file_hash", ASCENDING), ("model_version", ASCENDING), ("created_at", DESCENDING)],
+     {"name": "file_hash_recent", "partialFilterExpression": {"result": {"$exists": True}}}),
+]
+
+
+async def ensure_indexes():
+    """Create the indexes the API's queries rely on (no-op for ones that already exist)"""
+    created = []
+    for collection, keys, options in INDEXES:
+        try:
+            created.append(await collection.create_index(keys, **options))
+        except ServerSelectionTimeoutError as e:
+            logger.warning("MongoDB unreachable, skipping index bootstrap: %s", e)
+            break
+        except PyMongoError as e:
+            logger.warning("Could not create index %s on %s: %s", options.get("name"), collection.name, e)
+    return created
@@ -0,0 +1,155 @@
+import asyncio
+import logging
+import os
+import time
+from contextlib import asynccontextmanager
+from urllib.parse import urlsplit
+
+import httpx
+
+import circuit_breaker
+import metrics
+from circuit_breaker import CircuitOpenError
+
+logger = logging.getLogger(__name__)
+
+# -------------------- CONFIGURATION --------------------
+# Pool-wide limits shared by every outbound call (Adzuna, YouTube, RapidAPI, Lyzr)
+HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "100"))
+HTTP_MAX_KEEPALIVE = int(os.getenv("HTTP_MAX_KEEPALIVE", "20"))
+HTTP_KEEPALIVE_EXPIRY = float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "30"))
+
+# Max in-flight requests per upstream host, so one slow provider can't
+# take every pooled connection
+HTTP_PER_HOST_LIMIT = int(os.getenv("HTTP_PER_HOST_LIMIT", "10"))
+
+# Default timeouts (seconds); callers can override the total per request
+HTTP_CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", "3"))
+HTTP_DEFAULT_TIMEOUT = float(os.getenv("HTTP_DEFAULT_TIMEOUT", "10"))
+
+_client = None
+_transport = None
+_host_limits = {}
+
+
+def configure(transport=None):
+    """Swap the underlying transport (e.g. httpx.MockTransport for local stubs)"""
+    global _transport, _client
+    _transport = transport
+    _client = None
+    _host_limits.clear()
+
+
+def get_client():
+    """Return the shared AsyncClient, creating it on first use"""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=HTTP_MAX_KEEPALIVE,
+                keepalive_expiry=HTTP_KEEPALIVE_EXPIRY,
+            ),
+            timeout=httpx.Timeout(HTTP_DEFAULT_TIMEOUT, connect=HTTP_CONNECT_TIMEOUT),
+            transport=_transport,
+        )
+    return _client
+
+
+def _host_semaphore(url):
+    host = urlsplit(url).netloc
+    semaphore = _host_limits.get(host)
+    if semaphore is None:
+        semaphore = asyncio.Semaphore(HTTP_PER_HOST_LIMIT)
+        _host_limits[host] = semaphore
+    return semaphore
+
+
+def _timeout(timeout):
+    if timeout is None:
+        return httpx.USE_CLIENT_DEFAULT
+    return httpx.Timeout(timeout, connect=min(timeout, HTTP_CONNECT_TIMEOUT))
+
+
+def _healthy(response):
+    # 4xx means the provider is up and answering; only overload and server errors count against it
+    return response.status_code < 500 and response.status_code != 429
+
+
+def _observe(breaker, provider, ok, started, probe):
+    elapsed = time.perf_counter() - started
+    breaker.record(ok, elapsed, probe)
+    metrics.UPSTREAM_LATENCY.observe(elapsed, provider=provider, outcome="ok" if ok else "error")
+
+
+async def request(method, url, timeout=None, provider=None, **kwargs):
+    """
+    Send a request through the shared pool, respecting the per-host limit.
+
+    With a provider name ("adzuna", "lyzr", ...) the call also goes through
+    that provider's circuit breaker: it raises CircuitOpenError at once while
+    the provider is failing, and the timeout shrinks to its usual latency.
+    """
+    if provider is None:
+        async with _host_semaphore(url):
+            return await get_client().request(method, url, timeout=_timeout(timeout), **kwargs)
+
+    breaker = circuit_breaker.get(provider)
+    probe = breaker.before_call()
+    try:
+        async with _host_semaphore(url):
+            timeout = breaker.timeout(HTTP_DEFAULT_TIMEOUT if timeout is None else timeout)
+            started = time.perf_counter()
+            try:
+                response = await get_client().request(method, url, timeout=_timeout(timeout), **kwargs)
+            except httpx.TransportError:
+                _observe(breaker, provider, False, started, probe)
+                raise
+            _observe(breaker, provider, _healthy(response), started, probe)
+            return response
+    finally:
+        breaker.release(probe)
+
+
+async def get(url, timeout=None, **kwargs):
+    return await request("GET", url, timeout=timeout, **kwargs)
+
+
+async def post(url, timeout=None, **kwargs):
+    return await request("POST", url, timeout=timeout, **kwargs)
+
+
+@asynccontextmanager
+async def stream(method, url, timeout=None, provider=None, **kwargs):
+    """Like request(), but yields the response before its body is read (for aiter_lines/aiter_bytes)"""
+    breaker = circuit_breaker.get(provider) if provider is not None else None
+    probe = breaker.before_call() if breaker is not None else False
+    recorded = False
+    try:
+        async with _host_semaphore(url):
+            if breaker is not None:
+                timeout = breaker.timeout(HTTP_DEFAULT_TIMEOUT if timeout is None else timeout)
+            started = time.perf_counter()
+            try:
+                async with get_client().stream(method, url, timeout=_timeout(timeout), **kwargs) as response:
+                    # Judged on the status line (time to first byte), not on how long the body takes
+                    if breaker is not None:
+                        _observe(breaker, provider, _healthy(response), started, probe)
+                    recorded = True
+                    yield response
+            except httpx.TransportError:
+                if breaker is not None and not recorded:
+                    _observe(breaker, provider, False, started, probe)
+                raise
+    finally:
+        if breaker is not None:
+            breaker.release(probe)
+
+
+async def close():
+    """Close the shared client (called on application shutdown)"""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+    _host_limits.clear()
@@ -0,0 +1,66 @@
+"""
+Report what importing a backend module costs, per module and per package.
+
+    python import_report.py                  # import cost of server.py
+    python import_report.py nlp_utils --top 15
+    python import_report.py --budget 1500    # exit 1 if the import takes longer than 1.5s
+
+Runs the import in a fresh interpreter with `python -X importtime` and
+summarises its trace: the slowest modules by cumulative time (including
+what they import) and the top-level packages by their own (self) time.
+"""
+import argparse
+import subprocess
+import sys
+from collections import defaultdict
+from pathlib import Path
+
+
+def trace_imports(module):
+    """Return [(self_us, cumulative_us, depth, name)] for a fresh `import module`, in trace order"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=Path(__file__).parent, capture_output=True, text=True,
+    )
+    if result.returncode != 0:
+        raise SystemExit(f"import {module} failed:\n{result.stderr[-2000:]}")
+
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip())) // 2
+        rows.append((int(self_us), int(cumulative_us), depth, name.strip()))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("module", nargs="?", default="server", help="module to import (default: server)")
+    parser.add_argument("--top", type=int, default=25, help="rows per table (default: 25)")
+    parser.add_argument("--budget", type=float, help="fail if the total import time exceeds this many ms")
+    args = parser.parse_args()
+
+    rows = trace_imports(args.module)
+    total_ms = next(cumulative for _, cumulative, _, name in reversed(rows) if name == args.module) / 1000
+
+    print(f"import {args.module}: {total_ms:.0f} ms, {len(rows)} modules\n")
+    print(f"{'cumulative ms':>14} {'self ms':>9}  module")
+    for self_us, cumulative_us, depth, name in sorted(rows, key=lambda row: -row[1])[:args.top]:
+        print(f"{cumulative_us / 1000:14.1f} {self_us / 1000:9.1f}  {'  ' * depth}{name}")
+
+    packages = defaultdict(int)
+    for self_us, _, _, name in rows:
+        packages[name.split(".")[0]] += self_us
+    print(f"\n{'self ms':>14}  package")
+    for package, self_us in sorted(packages.items(), key=lambda item: -item[1])[:args.top]:
+        print(f"{self_us / 1000:14.1f}  {package}")
+
+    if args.budget is not None and total_ms > args.budget:
+        print(f"\nimport {args.module} took {total_ms:.0f} ms, over the {args.budget:.0f} ms budget")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,208 @@
+import asyncio
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+# -------------------- CONFIGURATION --------------------
+JOB_CORPUS_PATH = Path(os.getenv("JOB_CORPUS_PATH", Path(__file__).parent / "data" / "job_corpus.joblib"))
+JOB_CORPUS_MAX = int(os.getenv("JOB_CORPUS_MAX", "50000"))
+JOB_MAX_AGE_DAYS = float(os.getenv("JOB_MAX_AGE_DAYS", "14"))
+
+JOB_INGEST_INTERVAL = float(os.getenv("JOB_INGEST_INTERVAL", "3600"))
+JOB_INGEST_PAGES = int(os.getenv("JOB_INGEST_PAGES", "2"))
+JOB_INGEST_PAGE_SIZE = int(os.getenv("JOB_INGEST_PAGE_SIZE", "50"))
+JOB_INGEST_COUNTRY = os.getenv("JOB_INGEST_COUNTRY", "in")
+# User queries waiting for the next cycle; more than this are dropped until it runs
+JOB_INGEST_MAX_PENDING = int(os.getenv("JOB_INGEST_MAX_PENDING", "100"))
+JOB_INGEST_QUERIES = [
+    q.strip() for q in os.getenv(
+        "JOB_INGEST_QUERIES",
+        "python,java,javascript,react,node,sql,mongodb,machine learning,data science,data analyst,"
+        "devops,aws,docker,kubernetes,frontend developer,backend developer,full stack developer,"
+        "android developer,ui ux designer,project manager"
+    ).split(",") if q.strip()
+]
+
+
+class JobCorpus:
+    """
+    Locally stored job postings with a persistent TF-IDF index over their
+    skill profiles. The stored corpus is read on first access to jobs or
+    index, so importing this module does not touch disk or sklearn.
+    """
+
+    def __init__(self, path=JOB_CORPUS_PATH):
+        self.path = Path(path)
+        self.loaded = False
+        self._jobs = {}
+        self._index = None
+        self._load_lock = threading.Lock()
+        self.pending_queries = set()
+        self.recent_queries = {}
+        self.dropped_queries = 0
+        self.last_ingest = None
+
+    def __len__(self):
+        return len(self.jobs)
+
+    @property
+    def jobs(self):
+        if not self.loaded:
+            self.ensure_loaded()
+        return self._jobs
+
+    @property
+    def index(self):
+        if not self.loaded:
+            self.ensure_loaded()
+        return self._index
+
+    # -------------------- STORAGE --------------------
+    def ensure_loaded(self):
+        with self._load_lock:
+            if not self.loaded:
+                self.load()
+        return self
+
+    def load(self):
+        from vector_index import TfidfIndex
+        self._jobs = {}
+        self._index = TfidfIndex(stop_words="english")
+        if self.path.exists():
+            import joblib
+            try:
+                state = joblib.load(self.path)
+                index = TfidfIndex.load(self.path.with_suffix(".index.joblib"))
+                self._jobs, self._index = state["jobs"], index
+                self.last_ingest = state.get("last_ingest")
+                logger.info("Loaded %d jobs from %s", len(self._jobs), self.path)
+            except Exception as e:
+                logger.warning("Could not load job corpus from %s: %s", self.path, e)
+        self.loaded = True
+        return self
+
+    def save(self):
+        import joblib
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.index.save(self.path.with_suffix(".index.joblib"))
+        joblib.dump({"jobs": self.jobs, "last_ingest": self.last_ingest}, self.path)
+
+    # -------------------- UPDATES --------------------
+    def add_jobs(self, jobs):
+        """Insert or refresh postings (keyed by apply link) and index them incrementally"""
+        now = time.time()
+        keys, texts = [], []
+        for job in jobs:
+            key = job.get("apply_link") or f"{job.get('title')}|{job.get('company')}|{job.get('location')}"
+            posting = {k: v for k, v in job.items() if k not in ("id", "match_score")}
+            posting["ingested_at"] = now
+            if key not in self.jobs or self.jobs[key].get("skills") != posting.get("skills"):
+                keys.append(key)
+                texts.append(posting.get("skills", ""))
+            self.jobs[key] = posting
+        if keys:
+            self.index.add(keys, texts)
+        return len(keys)
+
+    def prune(self, max_age_days=JOB_MAX_AGE_DAYS, max_size=JOB_CORPUS_MAX):
+        """Drop postings older than max_age_days, then the oldest beyond max_size"""
+        cutoff = time.time() - max_age_days * 86400
+        expired = [key for key, job in self.jobs.items() if job["ingested_at"] < cutoff]
+        overflow = len(self.jobs) - len(expired) - max_size
+        if overflow > 0:
+            live = sorted((job["ingested_at"], key) for key, job in self.jobs.items() if job["ingested_at"] >= cutoff)
+            expired.extend(key for _, key in live[:overflow])
+        for key in expired:
+            del self.jobs[key]
+        self.index.remove(expired)
+        return len(expired)
+
+    # -------------------- QUERIES --------------------
+    def search(self, query, top_n=6):
+        """Return the top_n postings matching query as (job, score) pairs, best first"""
+        if not self.jobs:
+            return []
+        return [(self.jobs[key], score) for key, score in self.index.search(query, top_n) if score > 0]
+
+    def request_ingest(self, query, interval=JOB_INGEST_INTERVAL):
+        """
+        Remember a user query so the next ingestion cycle covers it. Queries
+        ingested within the last interval are skipped, and so is everything
+        once JOB_INGEST_MAX_PENDING queries are waiting; returns whether the
+        query was queued.
+        """
+        query = " ".join(query.lower().split())
+        if query in self.pending_queries:
+            return True
+        ingested_at = self.recent_queries.get(query)
+        if ingested_at is not None and time.time() - ingested_at < interval:
+            return False
+        if len(self.pending_queries) >= JOB_INGEST_MAX_PENDING:
+            self.dropped_queries += 1
+            return False
+        self.pending_queries.add(query)
+        return True
+
+    # -------------------- BACKGROUND INGESTION --------------------
+    async def ingest(self, fetch_page, queries, country=JOB_INGEST_COUNTRY,
+                     pages=JOB_INGEST_PAGES, page_size=JOB_INGEST_PAGE_SIZE):
+        """Pull postings for each query via fetch_page(country, query, count, page) and persist them"""
+        fetched = []
+        for query in queries:
+            for page in range(1, pages + 1):
+                jobs = await fetch_page(country, query, page_size, page=page)
+                fetched.extend(jobs)
+                if len(jobs) < page_size:
+                    break
+
+        # Apply the whole cycle at once so searches never see a half-updated index
+        added = self.add_jobs(fetched)
+        removed = self.prune()
+        self.index.refresh()
+        self.last_ingest = time.time()
+        self._remember_queries(queries)
+        await asyncio.to_thread(self.save)
+        logger.info("Job ingestion: %d new/updated, %d removed, %d total", added, removed, len(self.jobs))
+        return added
+
+    def _remember_queries(self, queries, interval=JOB_INGEST_INTERVAL):
+        """Record when queries were ingested, forgetting those older than interval"""
+        now = time.time()
+        self.recent_queries = {q: t for q, t in self.recent_queries.items() if now - t < interval}
+        self.recent_queries.update((" ".join(q.lower().split()), now) for q in queries)
+
+    async def run_ingestion(self, fetch_page, interval=JOB_INGEST_INTERVAL):
+        """Ingest the seed queries plus any user queries seen since the last cycle, forever"""
+        # Read the stored corpus off the event loop before deciding whether a cycle is due
+        await asyncio.to_thread(self.ensure_loaded)
+        while True:
+            due = self.last_ingest is None or time.time() - self.last_ingest >= interval
+            if due or self.pending_queries:
+                queries = (JOB_INGEST_QUERIES if due else []) + sorted(self.pending_queries)
+                queries = list(dict.fromkeys(queries))
+                self.pending_queries.clear()
+                try:
+                    await self.ingest(fetch_page, queries)
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    logger.warning("Job ingestion failed: %s", e)
+            await asyncio.sleep(min(interval, 60))
+
+    def stats(self):
+        return {
+            "loaded": self.loaded,
+            "jobs": len(self._jobs),
+            "vocabulary": len(self._index.vocabulary) if self._index is not None else 0,
+            "pending_queries": len(self.pending_queries),
+            "recent_queries": len(self.recent_queries),
+            "dropped_queries": self.dropped_queries,
+            "last_ingest": self.last_ingest,
+        }
+
+
+job_corpus = JobCorpus()
@@ -0,0 +1,157 @@
+import bisect
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+# -------------------- CONFIGURATION --------------------
+METRICS_PREFIX = os.getenv("METRICS_PREFIX", "careercraft")
+# Upper bounds (seconds) of the latency histogram buckets
+DEFAULT_BUCKETS = tuple(
+    float(b) for b in os.getenv(
+        "METRICS_BUCKETS", "0.005,0.01,0.025,0.05,0.1,0.25,0.5,1,2.5,5,10,30"
+    ).split(",")
+)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Histograms are observed directly; everything else is read at scrape time
+# from the stats() functions the other modules already keep
+_histograms = []
+_stats_sources = []
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(pairs):
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+def _number(value):
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Histogram:
+    """Cumulative-bucket histogram with a fixed set of label names"""
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name = f"{METRICS_PREFIX}_{name}"
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        # label values -> [bucket counts..., sum]
+        self._series = {}
+        # observe() is also called from worker threads (e.g. asyncio.to_thread)
+        self._lock = threading.Lock()
+        _histograms.append(self)
+
+    def observe(self, value, **labels):
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0] * len(self.buckets) + [0.0]
+            series[index] += 1
+            series[-1] += value
+
+    @contextmanager
+    def time(self, **labels):
+        """Observe the wall time of a `with` block (awaits inside it included)"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def collect(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = sorted((key, list(values)) for key, values in self._series.items())
+        for key, values in series:
+            pairs = list(zip(self.labelnames, key))
+            cumulative = 0
+            for bound, count in zip(self.buckets, values):
+                cumulative += count
+                lines.append(f"{self.name}_bucket{_labels(pairs + [('le', _number(bound))])} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(pairs)} {_number(values[-1])}")
+            lines.append(f"{self.name}_count{_labels(pairs)} {cumulative}")
+        return lines
+
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "Time to the response start, per route template",
+    ("method", "route", "status"),
+)
+STAGE_LATENCY = Histogram(
+    "stage_duration_seconds",
+    "Time spent in one step of a request pipeline",
+    ("stage",),
+)
+UPSTREAM_LATENCY = Histogram(
+    "upstream_request_duration_seconds",
+    "Outbound HTTP call duration per provider",
+    ("provider", "outcome"),
+)
+
+
+def stage(name):
+    """with metrics.stage("pdf_extract"): ..."""
+    return STAGE_LATENCY.time(stage=name)
+
+
+# -------------------- STATS SOURCES --------------------
+def register_stats(name, stats, label=None):
+    """
+    Expose a stats() function as gauges named <prefix>_<name>_<key>.
+
+    With label set, stats() returns {instance: {key: value}} (like
+    cache.all_stats()) and each instance becomes a label value.
+    """
+    _stats_sources.append((name, stats, label))
+
+
+def _flatten(prefix, stats):
+    for key, value in stats.items():
+        if isinstance(value, dict):
+            yield from _flatten(f"{prefix}_{key}", value)
+        else:
+            yield f"{prefix}_{key}", key, value
+
+
+def _gauge_samples(name, stats, label):
+    instances = stats.items() if label else [(None, stats)]
+    for instance, values in instances:
+        base = [(label, instance)] if label else []
+        for metric, key, value in _flatten(f"{METRICS_PREFIX}_{name}", values):
+            if value is None:
+                continue
+            if isinstance(value, str):
+                # Enum-like values (a circuit's state, the pool mode) as label=1 samples
+                yield metric, base + [(key, value)], 1
+            elif isinstance(value, (bool, int, float)):
+                yield metric, base, int(value) if isinstance(value, bool) else value
+
+
+def render():
+    """All metrics in the Prometheus text format"""
+    lines = []
+    for histogram in _histograms:
+        lines.extend(histogram.collect())
+
+    for name, stats, label in _stats_sources:
+        samples = {}
+        for metric, pairs, value in _gauge_samples(name, stats(), label):
+            samples.setdefault(metric, []).append((pairs, value))
+        for metric, values in samples.items():
+            lines.append(f"# TYPE {metric} gauge")
+            lines.extend(f"{metric}{_labels(pairs)} {_number(value)}" for pairs, value in values)
+    return "\n".join(lines) + "\n"
@@ -1,30 +1,35 @@
-from sklearn.ensemble import RandomForestRegressor
 import numpy as np
-import joblib
 import os
 
-MODEL_PATH = "models/resume_rf_model.pkl"
-CAREER_MODEL_PATH = "models/career_model.pkl"
+from forest_engine import CompiledForest
+from model_registry import ModelRegistry, ModelNotAvailable
+
+RESUME_MODEL = "resume"
+CAREER_MODEL = "career"
+
+# Inference backend: "sklearn" (default) or "compiled" (flat NumPy node tables, identical predictions)
+MODEL_BACKEND = os.getenv("MODEL_BACKEND", "sklearn").lower()
 
 def train_resume_model():
     """Train Random Forest model for resume scoring"""
-    # Training data: [word_count, skills, projects, education, experience, certifications]
+    # Training data: [word_count, skills, projects, education, experience]
+    # (same columns as nlp_utils.RESUME_FEATURE_NAMES)
     X_train = [
-        [700, 10, 1, 1, 1, 1],  # Excellent resume
-        [500, 8, 1, 1, 1, 0],   # Strong
-        [350, 6, 1, 1, 0, 0],   # Good
-        [200, 3, 0, 1, 0, 0],   # Average
-        [120, 1, 0, 0, 0, 0]    # Weak
+        [700, 10, 1, 1, 1],  # Excellent resume
+        [500, 8, 1, 1, 1],   # Strong
+        [350, 6, 1, 1, 0],   # Good
+        [200, 3, 0, 1, 0],   # Average
+        [120, 1, 0, 0, 0]    # Weak
     ]
 
     # Resume Score (0–100)
     y_train = [95, 85, 70, 50, 30]
 
+    from sklearn.ensemble import RandomForestRegressor
     model = RandomForestRegressor(n_estimators=200, random_state=42)
     model.fit(X_train, y_train)
 
-    os.makedirs("models", exist_ok=True)
-    joblib.dump(model, MODEL_PATH)
+    registry.publish(RESUME_MODEL, model)
     return model
 
 
@@ -47,76 +52,98 @@ def train_career_model():
     # Success probability (0-100)
     y_train = [85, 72, 90, 60, 55, 88, 75, 83, 65, 92]
 
+    from sklearn.ensemble import RandomForestRegressor
     model = RandomForestRegressor(n_estimators=200, random_state=42)
     model.fit(X_train, y_train)
 
-    os.makedirs("models", exist_ok=True)
-    joblib.dump(model, CAREER_MODEL_PATH)
+    registry.publish(CAREER_MODEL, model)
+    return model
+
+
+CAREER_FEATURE_NAMES = ['age', 'experience_years', 'education_level', 'num_skills', 'location_tier', 'job_changes']
+
+# Recommendation rules evaluated column-wise: (feature, comparison, threshold, message)
+CAREER_RECOMMENDATION_RULES = [
+    ('num_skills', np.less, 8, "Expand your skill set to increase market value"),
+    ('experience_years', np.less, 5, "Gain more hands-on experience through projects"),
+    ('education_level', np.less, 3, "Consider advanced certifications or degrees"),
+    ('job_changes', np.greater, 5, "Show stability in your next role"),
+]
+DEFAULT_CAREER_RECOMMENDATION = "You're on a great track! Keep building expertise in your domain"
+
+
+def top_factors(model, n=3):
+    """Names of the n most important features (importances are fixed once a model is fitted)"""
+    top_indices = np.argsort(model.feature_importances_)[::-1][:n]
+    return [CAREER_FEATURE_NAMES[i] for i in top_indices]
+
+
+def inference_backend(model):
+    """Return the object used for predict(): the sklearn forest or its compiled form"""
+    if MODEL_BACKEND == "compiled" and model is not None:
+        return CompiledForest.from_sklearn(model)
     return model
 
 
-def load_model():
-    if os.path.exists(CAREER_MODEL_PATH):
-        return joblib.load(CAREER_MODEL_PATH)
-    else:
-        return train_career_model()
+def _prepare_career(model):
+    return {"predictor": inference_backend(model), "top_factors": top_factors(model)}
 
 
-def load_resume_model():
-    if os.path.exists(MODEL_PATH):
-        return joblib.load(MODEL_PATH)
-    else:
-        return train_resume_model()
+# Models are loaded lazily on first use (and re-loaded when a new version is published)
+registry = ModelRegistry()
+registry.register(RESUME_MODEL, "resume_rf_model.pkl", prepare=lambda model: {"predictor": inference_backend(model)})
+registry.register(CAREER_MODEL, "career_model.pkl", prepare=_prepare_career)
 
 
-# Initialize models at module load
-rf_model = load_resume_model()
-career_model = load_model()
+def load_models():
+    """Load every registered model now (e.g. in a freshly started worker)"""
+    for name in (RESUME_MODEL, CAREER_MODEL):
+        registry.get(name)
 
 
+def predict_resume_scores(feature_rows):
+    """Predict scores for many resumes in one vectorised Random Forest call"""
+    X = np.asarray(feature_rows, dtype=float).reshape(len(feature_rows), -1)
+    predictor = registry.get(RESUME_MODEL).prepared["predictor"]
+    return [round(float(score), 2) for score in predictor.predict(X)]
+
 def predict_resume_score(features):
     """Predict resume score using Random Forest model"""
-    features = np.array(features).reshape(1, -1)
-    score = rf_model.predict(features)[0]
-    return round(float(score), 2)
+    return predict_resume_scores([features])[0]
+
+def resume_model_version():
+    return registry.get(RESUME_MODEL).version
+
+def predict_career_success_batch(rows):
+    """Predict career success for many rows (columns as CAREER_FEATURE_NAMES) in one vectorised call"""
+    try:
+        career = registry.get(CAREER_MODEL).prepared
+    except ModelNotAvailable:
+        return None
+
+    X = np.asarray(rows, dtype=float).reshape(len(rows), len(CAREER_FEATURE_NAMES))
+
+    # Predict probability, clamped to 0-100 range
+    probs = np.clip(career["predictor"].predict(X), 0, 100)
+
+    # Evaluate every recommendation rule over its whole column at once
+    rule_hits = np.array([
+        compare(X[:, CAREER_FEATURE_NAMES.index(feature)], threshold)
+        for feature, compare, threshold, _ in CAREER_RECOMMENDATION_RULES
+    ]).reshape(len(CAREER_RECOMMENDATION_RULES), len(X))
+
+    results = []
+    for row, prob in enumerate(probs):
+        recommendations = [rule[3] for rule, hits in zip(CAREER_RECOMMENDATION_RULES, rule_hits) if hits[row]]
+        results.append({
+            'success_probability': round(float(prob), 2),
+            'top_factors': list(career["top_factors"]),
+            'recommendations': recommendations or [DEFAULT_CAREER_RECOMMENDATION]
+        })
+
+    return results
 
 def predict_career_success(age, experience_years, education_level, num_skills, location_tier, job_changes):
     """Predict career success probability using Random Forest model"""
-    if career_model is None:
-        return None
-    
-    # Prepare input
-    X = np.array([[age, experience_years, education_level, num_skills, location_tier, job_changes]])
-    
-    # Predict probability
-    prob = career_model.predict(X)[0]
-    prob = max(0, min(100, prob))  # Clamp to 0-100 range
-    
-    # Get feature importance
-    feature_names = ['age', 'experience_years', 'education_level', 'num_skills', 'location_tier', 'job_changes']
-    feature_values = [age, experience_years, education_level, num_skills, location_tier, job_changes]
-    importances = career_model.feature_importances_
-    
-    # Get top 3 factors
-    top_indices = np.argsort(importances)[::-1][:3]
-    top_factors = [feature_names[i] for i in top_indices]
-    
-    # Generate recommendations
-    recommendations = []
-    if num_skills < 8:
-        recommendations.append("Expand your skill set to increase market value")
-    if experience_years < 5:
-        recommendations.append("Gain more hands-on experience through projects")
-    if education_level < 3:
-        recommendations.append("Consider advanced certifications or degrees")
-    if job_changes > 5:
-        recommendations.append("Show stability in your next role")
-    
-    if not recommendations:
-        recommendations = ["You're on a great track! Keep building expertise in your domain"]
-    
-    return {
-        'success_probability': round(prob, 2),
-        'top_factors': top_factors,
-        'recommendations': recommendations
-    }
+    results = predict_career_success_batch([[age, experience_years, education_level, num_skills, location_tier, job_changes]])
+    return results[0] if results is not None else None
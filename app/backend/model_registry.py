@@ -0,0 +1,197 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+# -------------------- CONFIGURATION --------------------
+MODELS_DIR = Path(os.getenv("MODELS_DIR", Path(__file__).parent / "models"))
+# How often (seconds) get() checks the manifest for a newly published version
+MODEL_RELOAD_INTERVAL = float(os.getenv("MODEL_RELOAD_INTERVAL", "30"))
+MANIFEST_NAME = "manifest.json"
+
+
+class ModelNotAvailable(Exception):
+    """Raised when a model has no artefact on disk (train it with train_model.py)"""
+
+
+class LoadedModel:
+    def __init__(self, name, model, prepared, path, version, sha256):
+        self.name = name
+        self.model = model
+        self.prepared = prepared
+        self.path = path
+        self.version = version
+        self.sha256 = sha256
+        self.loaded_at = time.time()
+
+    def info(self):
+        return {
+            "version": self.version,
+            "sha256": self.sha256,
+            "path": str(self.path),
+            "loaded_at": self.loaded_at,
+        }
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ModelRegistry:
+    """
+    Lazily loads versioned model artefacts and hot-swaps them when a new
+    version is published.
+
+    models/manifest.json maps each model name to its current artefact
+    (file, version, sha256). Models without a manifest entry fall back to
+    their registered default file. Artefacts are loaded with joblib
+    mmap_mode="r" and verified against the manifest checksum; a model is
+    never trained on the request path.
+    """
+
+    def __init__(self, models_dir=MODELS_DIR, reload_interval=MODEL_RELOAD_INTERVAL):
+        self.models_dir = Path(models_dir)
+        self.reload_interval = reload_interval
+        self._defaults = {}
+        self._prepare = {}
+        self._loaded = {}
+        self._checked_at = {}
+        # name -> (checked_at, version) last resolved by version(), and the last version that failed to load
+        self._versions = {}
+        self._failed = {}
+        self._lock = threading.Lock()
+
+    @property
+    def manifest_path(self):
+        return self.models_dir / MANIFEST_NAME
+
+    def register(self, name, default_file, prepare=None):
+        """Declare a model; prepare(model) derives whatever should be cached alongside it"""
+        self._defaults[name] = default_file
+        self._prepare[name] = prepare
+
+    # -------------------- MANIFEST --------------------
+    def read_manifest(self):
+        try:
+            with open(self.manifest_path) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+
+    def _write_manifest(self, manifest):
+        tmp = self.manifest_path.with_suffix(".json.tmp")
+        with open(tmp, "w") as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(tmp, self.manifest_path)
+
+    def _resolve(self, name):
+        """Return (path, version, expected_sha256) of the current artefact for name"""
+        entry = self.read_manifest().get(name)
+        if entry:
+            return self.models_dir / entry["file"], entry["version"], entry.get("sha256")
+        path = self.models_dir / self._defaults[name]
+        if not path.exists():
+            raise ModelNotAvailable(f"No artefact for model '{name}' in {self.models_dir}; run train_model.py")
+        return path, f"file-{int(path.stat().st_mtime)}", None
+
+    # -------------------- LOADING --------------------
+    def _load(self, name, path, version, expected_sha256):
+        if not path.exists():
+            raise ModelNotAvailable(f"Artefact {path} for model '{name}' is missing")
+        sha256 = file_sha256(path)
+        if expected_sha256 and sha256 != expected_sha256:
+            raise ModelNotAvailable(f"Checksum mismatch for model '{name}' ({path})")
+
+        import joblib  # unpickling the forest imports sklearn, so keep both off the import path
+        model = joblib.load(path, mmap_mode="r")
+        prepare = self._prepare.get(name)
+        prepared = prepare(model) if prepare else None
+        logger.info("Loaded model %s version %s", name, version)
+        return LoadedModel(name, model, prepared, path, version, sha256)
+
+    def get(self, name):
+        """Return the LoadedModel for name, loading on first use and picking up new versions"""
+        loaded = self._loaded.get(name)
+        now = time.monotonic()
+        if loaded is not None and now - self._checked_at.get(name, 0) < self.reload_interval:
+            return loaded
+
+        with self._lock:
+            loaded = self._loaded.get(name)
+            self._checked_at[name] = now
+            version = None
+            try:
+                path, version, expected_sha256 = self._resolve(name)
+                if loaded is None or (loaded.version != version and self._failed.get(name) != version):
+                    self._loaded[name] = self._load(name, path, version, expected_sha256)
+            except Exception as e:
+                # A broken new artefact (bad pickle, sklearn skew, failing prepare) must not take down the old one
+                if loaded is None:
+                    raise
+                if not isinstance(e, ModelNotAvailable):
+                    self._failed[name] = version
+                logger.exception("Keeping model %s version %s", name, loaded.version)
+            return self._loaded[name]
+
+    def version(self, name):
+        """Version get(name) serves or would load, without loading the artefact (None if there is none)"""
+        loaded = self._loaded.get(name)
+        now = time.monotonic()
+        if loaded is not None and now - self._checked_at.get(name, 0) < self.reload_interval:
+            return loaded.version
+        checked_at, version = self._versions.get(name, (None, None))
+        if checked_at is not None and now - checked_at < self.reload_interval:
+            return version
+        try:
+            version = self._resolve(name)[1]
+            if loaded is not None and version == self._failed.get(name):
+                version = loaded.version
+        except ModelNotAvailable:
+            version = loaded.version if loaded is not None else None
+        self._versions[name] = (now, version)
+        return version
+
+    def swap(self, name, model, version=None):
+        """Hot-swap an in-memory model without touching disk"""
+        prepare = self._prepare.get(name)
+        version = version or f"memory-{int(time.time())}"
+        with self._lock:
+            self._loaded[name] = LoadedModel(name, model, prepare(model) if prepare else None, None, version, None)
+            self._checked_at[name] = float("inf")
+        return version
+
+    # -------------------- PUBLISHING --------------------
+    def publish(self, name, model):
+        """Write a new versioned artefact and point the manifest at it; running workers pick it up"""
+        import joblib
+        self.models_dir.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            manifest = self.read_manifest()
+            version = int(manifest.get(name, {}).get("version", 0)) + 1
+            filename = f"{name}-v{version}.pkl"
+            tmp = self.models_dir / (filename + ".tmp")
+            joblib.dump(model, tmp)
+            os.replace(tmp, self.models_dir / filename)
+
+            manifest[name] = {
+                "file": filename,
+                "version": version,
+                "sha256": file_sha256(self.models_dir / filename),
+                "published_at": datetime.now(timezone.utc).isoformat(),
+            }
+            self._write_manifest(manifest)
+        logger.info("Published model %s version %s", name, version)
+        return version
+
+    def info(self):
+        return {name: loaded.info() for name, loaded in self._loaded.items()}
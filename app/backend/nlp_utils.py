@@ -1,33 +1,18 @@
+import os
 import re
-import PyPDF2
-from textblob import TextBlob
-import nltk
+import mmap
+from functools import cached_property
 
-# Download required NLTK data (run once)
-try:
-    nltk.data.find('tokenizers/punkt')
-except LookupError:
-    nltk.download('punkt', quiet=True)
+import sentiment as sentiment_engine
 
-try:
-    nltk.data.find('corpora/stopwords')
-except LookupError:
-    nltk.download('stopwords', quiet=True)
+# PyPDF2 is imported on first use so that importing this module stays cheap;
+# sentiment comes from sentiment.py (SENTIMENT_BACKEND), which needs no NLTK corpora.
 
-from nltk.corpus import stopwords
-from nltk.tokenize import word_tokenize
 
-def extract_text_from_pdf(file):
-    """Extract text from PDF file using PyPDF2"""
-    text = ""
-    pdf_reader = PyPDF2.PdfReader(file)
-
-    for page in pdf_reader.pages:
-        page_text = page.extract_text()
-        if page_text:
-            text += page_text + " "
-
-    return text
+def preload():
+    """Import/compile the lazily loaded dependencies now (worker warm-up / startup prewarm)"""
+    import PyPDF2  # noqa: F401
+    sentiment_engine.get_engine().load()
 
 # Common technical skills
 COMMON_SKILLS = [
@@ -42,172 +27,260 @@ BIASED_WORDS = [
     'boy', 'girl', 'man', 'woman', 'gentleman', 'lady'
 ]
 
-def extract_text_from_pdf(file):
+# Action words / sections rewarded by the ATS score
+ATS_KEYWORDS = ['experience', 'project', 'managed', 'led', 'developed', 'achieved', 'improved']
+
+# Section markers used as resume features (matched as word prefixes, e.g. "projects", "internship")
+PROJECT_MARKERS = ['project']
+EDUCATION_MARKERS = ['b.tech', 'bachelor']
+EXPERIENCE_MARKERS = ['experience', 'intern']
+
+
+class KeywordMatcher:
+    """
+    Finds every keyword of several groups in one pass over the text.
+
+    All terms are compiled into a single alternation regex (longest first)
+    anchored at word starts. Terms in prefix_groups may be followed by more
+    letters ("project" matches "projects"); all others must be whole words.
+    """
+
+    def __init__(self, groups, prefix_groups=()):
+        self.groups = list(groups)
+        self._groups_by_term = {}
+        prefix_terms = set()
+        for group, terms in groups.items():
+            for term in terms:
+                term = term.lower()
+                self._groups_by_term.setdefault(term, set()).add(group)
+                if group in prefix_groups:
+                    prefix_terms.add(term)
+
+        alternatives = [
+            re.escape(term) + ("" if term in prefix_terms else r"(?![a-z0-9])")
+            for term in sorted(self._groups_by_term, key=len, reverse=True)
+        ]
+        self._pattern = re.compile(r"(?<![a-z0-9])(?:" + "|".join(alternatives) + ")")
+
+    def match(self, text):
+        """Return {group: set of terms found} for the given text"""
+        found = {group: set() for group in self.groups}
+        for hit in self._pattern.finditer(text.lower()):
+            term = hit.group()
+            for group in self._groups_by_term[term]:
+                found[group].add(term)
+        return found
+
+
+KEYWORD_MATCHER = KeywordMatcher(
+    {
+        'skills': COMMON_SKILLS,
+        'bias': BIASED_WORDS,
+        'ats': ATS_KEYWORDS,
+        'projects': PROJECT_MARKERS,
+        'education': EDUCATION_MARKERS,
+        'experience': EXPERIENCE_MARKERS,
+    },
+    prefix_groups=('projects', 'education', 'experience'),
+)
+
+# Upper bound on pages read from a single PDF
+MAX_PDF_PAGES = int(os.getenv("MAX_PDF_PAGES", "50"))
+
+
+def join_pages(page_texts):
+    return "".join(page_text + " " for page_text in page_texts if page_text)
+
+
+def extract_text_from_pdf(file, max_pages=MAX_PDF_PAGES):
     """Extract text from PDF file using PyPDF2"""
-    text = ""
+    import PyPDF2
     pdf_reader = PyPDF2.PdfReader(file)
+    pages = pdf_reader.pages[:max_pages]
+    return join_pages(page.extract_text() for page in pages)
 
-    for page in pdf_reader.pages:
-        page_text = page.extract_text()
-        if page_text:
-            text += page_text + " "
-
-    return text
-
-def extract_resume_features(resume_text):
-    """Extract features from resume for ML model"""
-    text = resume_text.lower()
-
-    # Feature 1: Total words in resume
-    word_count = len(text.split())
-
-    # Feature 2: Skills detected
-    skills_found = [skill for skill in COMMON_SKILLS if skill in text]
-    skills_count = len(skills_found)
-
-    # Feature 3: Projects presence
-    projects = 1 if "project" in text else 0
 
-    # Feature 4: Education presence
-    education = 1 if ("b.tech" in text or "bachelor" in text or "degree" in text) else 0
+def extract_pdf_pages(path, start, stop):
+    """Extract text of pages [start, stop) from a PDF on disk; returns (page_texts, total_pages)"""
+    import PyPDF2
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        pdf_reader = PyPDF2.PdfReader(data)
+        total_pages = len(pdf_reader.pages)
+        page_texts = [pdf_reader.pages[i].extract_text() or "" for i in range(start, min(stop, total_pages))]
+    return page_texts, total_pages
 
-    # Feature 5: Experience presence
-    experience = 1 if ("experience" in text or "intern" in text) else 0
+# Feature vector consumed by the resume scoring model, in column order
+RESUME_FEATURE_NAMES = ['word_count', 'skills_count', 'has_projects', 'has_education', 'has_experience']
 
-    # Feature 6: Certifications (bonus smart feature)
-    certifications = 1 if ("certification" in text or "certificate" in text) else 0
+VOWEL_GROUPS = re.compile(r'[aeiou]+')
 
-    return [word_count, skills_count, projects, education, experience, certifications]
-
-def extract_skills(text):
-    """Extract skills from resume text"""
-    text_lower = text.lower()
-    found_skills = []
-    for skill in COMMON_SKILLS:
-        if skill in text_lower:
-            found_skills.append(skill)
-    return list(set(found_skills))
 
-def sentiment_analysis(text):
-    """Analyze sentiment of resume text"""
-    blob = TextBlob(text)
-    polarity = blob.sentiment.polarity
-    
+def sentiment_result(polarity):
+    """Label a polarity score positive / negative / neutral"""
     if polarity > 0.1:
         sentiment = 'positive'
     elif polarity < -0.1:
         sentiment = 'negative'
     else:
         sentiment = 'neutral'
-    
+
     return {
         'sentiment': sentiment,
         'polarity': round(polarity, 2)
     }
 
-def detect_bias(text):
-    """Detect gendered or biased language"""
-    text_lower = text.lower()
-    found_bias = []
-    
-    for word in BIASED_WORDS:
-        if re.search(r'\b' + word + r'\b', text_lower):
-            found_bias.append(word)
-    
-    return list(set(found_bias))
 
-def calculate_readability(text):
-    """Calculate Flesch Reading Ease score"""
-    try:
-        # Flesch Reading Ease = 206.835 - 1.015 * (words/sentences) - 84.6 * (syllables/words)
-        sentences = text.split('.')
-        words = text.split()
-        
-        if len(sentences) == 0 or len(words) == 0:
+class ResumeDocument:
+    """
+    One resume's text, tokenised once.
+
+    Word/sentence/syllable counts and keyword matches are computed on first
+    access and shared by every feature (skills, sentiment, bias,
+    readability, ATS score and the ML feature vector).
+    """
+
+    def __init__(self, text):
+        self.text = text
+
+    # -------------------- SHARED TOKENISATION --------------------
+    @cached_property
+    def lower(self):
+        return self.text.lower()
+
+    @cached_property
+    def words(self):
+        return self.lower.split()
+
+    @cached_property
+    def sentence_count(self):
+        return len(self.text.split('.'))
+
+    @cached_property
+    def syllable_count(self):
+        # Simplified syllable count: vowel groups per word, at least one
+        return sum(max(1, len(VOWEL_GROUPS.findall(word))) for word in self.words)
+
+    @cached_property
+    def matches(self):
+        return KEYWORD_MATCHER.match(self.lower)
+
+    # -------------------- FEATURES --------------------
+    @cached_property
+    def skills(self):
+        return [skill for skill in COMMON_SKILLS if skill in self.matches['skills']]
+
+    @cached_property
+    def bias(self):
+        return [word for word in BIASED_WORDS if word in self.matches['bias']]
+
+    @cached_property
+    def sentiment(self):
+        return sentiment_result(sentiment_engine.polarity(self.text))
+
+    @cached_property
+    def readability(self):
+        """Flesch Reading Ease = 206.835 - 1.015 * (words/sentences) - 84.6 * (syllables/words)"""
+        if not self.words:
             return 0
-        
-        # Simplified syllable count
-        syllables = sum([max(1, len(re.findall(r'[aeiou]+', word.lower()))) for word in words])
-        
-        avg_words_per_sentence = len(words) / max(1, len(sentences))
-        avg_syllables_per_word = syllables / len(words)
-        
+
+        avg_words_per_sentence = len(self.words) / max(1, self.sentence_count)
+        avg_syllables_per_word = self.syllable_count / len(self.words)
+
         flesch_score = 206.835 - 1.015 * avg_words_per_sentence - 84.6 * avg_syllables_per_word
         flesch_score = max(0, min(100, flesch_score))
-        
+
         return round(flesch_score, 2)
-    except:
-        return 50.0
 
-def calculate_ats_score(text, skills):
-    """Calculate ATS compatibility score"""
-    score = 50  # Base score
-    
-    # Bonus for skills
-    score += min(30, len(skills) * 3)
-    
-    # Bonus for keywords
-    keywords = ['experience', 'project', 'managed', 'led', 'developed', 'achieved', 'improved']
-    text_lower = text.lower()
-    keyword_count = sum([1 for kw in keywords if kw in text_lower])
-    score += min(20, keyword_count * 3)
-    
-    # Ensure score is between 0-100
-    score = max(0, min(100, score))
-    
-    return round(score, 2)
+    @cached_property
+    def ats_score(self):
+        score = 50  # Base score
+
+        # Bonus for skills
+        score += min(30, len(self.skills) * 3)
+
+        # Bonus for keywords
+        score += min(20, len(self.matches['ats']) * 3)
+
+        # Ensure score is between 0-100
+        score = max(0, min(100, score))
+
+        return round(score, 2)
+
+    @cached_property
+    def features(self):
+        """ML feature vector, ordered as RESUME_FEATURE_NAMES"""
+        return [
+            len(self.words),
+            len(self.skills),
+            1 if self.matches['projects'] else 0,
+            1 if self.matches['education'] else 0,
+            1 if self.matches['experience'] else 0,
+        ]
+
+    def analysis(self):
+        """Complete resume analysis"""
+        skills = self.skills
+        readability = self.readability
+        ats_score = self.ats_score
+        bias = self.bias
+        sentiment = self.sentiment
+
+        # Generate improvement tips
+        tips = []
+        if len(skills) < 5:
+            tips.append("Add more specific technical skills")
+        if readability < 50:
+            tips.append("Simplify language for better readability")
+        if ats_score < 70:
+            tips.append("Include more action verbs and achievements")
+        if len(bias) > 0:
+            tips.append("Remove gendered language to avoid bias")
+        if sentiment['sentiment'] == 'negative':
+            tips.append("Use more positive, achievement-focused language")
+
+        if not tips:
+            tips = ["Great resume! Consider adding quantifiable achievements"]
+
+        return {
+            'skills': skills,
+            'sentiment': sentiment['sentiment'],
+            'readability_score': readability,
+            'ats_score': ats_score,
+            'bias_detected': bias,
+            'improvement_tips': tips
+        }
 
-def analyze_resume(text):
-    """Complete resume analysis"""
-    skills = extract_skills(text)
-    sentiment = sentiment_analysis(text)
-    bias = detect_bias(text)
-    readability = calculate_readability(text)
-    ats_score = calculate_ats_score(text, skills)
-    
-    # Generate improvement tips
-    tips = []
-    if len(skills) < 5:
-        tips.append("Add more specific technical skills")
-    if readability < 50:
-        tips.append("Simplify language for better readability")
-    if ats_score < 70:
-        tips.append("Include more action verbs and achievements")
-    if len(bias) > 0:
-        tips.append("Remove gendered language to avoid bias")
-    if sentiment['sentiment'] == 'negative':
-        tips.append("Use more positive, achievement-focused language")
-    
-    if not tips:
-        tips = ["Great resume! Consider adding quantifiable achievements"]
-    
-    return {
-        'skills': skills,
-        'sentiment': sentiment['sentiment'],
-        'readability_score': readability,
-        'ats_score': ats_score,
-        'bias_detected': bias,
-        'improvement_tips': tips
-    }
 
 def extract_resume_features(resume_text):
     """Extract features from resume for ML model"""
-    text = resume_text.lower()
+    return ResumeDocument(resume_text).features
 
-    # Feature 1: Total words
-    word_count = len(text.split())
+def extract_skills(text):
+    """Extract skills from resume text"""
+    return ResumeDocument(text).skills
 
-    # Feature 2: Skills count
-    skills_found = [skill for skill in COMMON_SKILLS if skill in text]
-    skills_count = len(skills_found)
+def sentiment_analysis(text):
+    """Analyze sentiment of resume text"""
+    return ResumeDocument(text).sentiment
 
-    # Feature 3: Projects section detection
-    projects = 1 if "project" in text else 0
+def sentiment_analysis_batch(texts):
+    """Analyze sentiment of many resume texts in one engine call"""
+    return [sentiment_result(polarity) for polarity in sentiment_engine.polarities(texts)]
 
-    # Feature 4: Education detection
-    education = 1 if ("b.tech" in text or "bachelor" in text) else 0
+def detect_bias(text):
+    """Detect gendered or biased language"""
+    return ResumeDocument(text).bias
 
-    # Feature 5: Experience detection
-    experience = 1 if ("experience" in text or "intern" in text) else 0
+def calculate_readability(text):
+    """Calculate Flesch Reading Ease score"""
+    return ResumeDocument(text).readability
+
+def calculate_ats_score(text, skills):
+    """Calculate ATS compatibility score"""
+    doc = ResumeDocument(text)
+    doc.skills = skills
+    return doc.ats_score
 
-    return [word_count, skills_count, projects, education, experience]
+def analyze_resume(text):
+    """Complete resume analysis"""
+    return ResumeDocument(text).analysis()
@@ -0,0 +1,121 @@
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import bcrypt
+
+# -------------------- CONFIGURATION --------------------
+# bcrypt work factor for new hashes; stored hashes with another cost are re-hashed on login
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+# bcrypt releases the GIL, so a small thread pool hashes on that many cores in parallel
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(min(4, os.cpu_count() or 1))))
+# Hash/verify jobs allowed in flight before callers get HasherSaturated
+PASSWORD_HASH_MAX_PENDING = int(os.getenv("PASSWORD_HASH_MAX_PENDING", str(PASSWORD_HASH_WORKERS * 16)))
+
+_executor = None
+_pending = 0
+_rejected = 0
+_hashed = 0
+_verified = 0
+_rehashed = 0
+
+
+class HasherSaturated(Exception):
+    """Raised when PASSWORD_HASH_MAX_PENDING hash/verify jobs are already in flight"""
+
+
+def configure(rounds=None, workers=None, max_pending=None):
+    """Change the work factor, pool size and/or admission limit (e.g. from a benchmark); the pool is recreated lazily"""
+    global BCRYPT_ROUNDS, PASSWORD_HASH_WORKERS, PASSWORD_HASH_MAX_PENDING
+    if rounds is not None:
+        BCRYPT_ROUNDS = rounds
+    if workers is not None:
+        PASSWORD_HASH_WORKERS = workers
+        PASSWORD_HASH_MAX_PENDING = workers * 16
+        shutdown()
+    if max_pending is not None:
+        PASSWORD_HASH_MAX_PENDING = max_pending
+
+
+def get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=PASSWORD_HASH_WORKERS, thread_name_prefix="bcrypt")
+    return _executor
+
+
+async def _run(fn, *args):
+    global _pending, _rejected
+    if _pending >= PASSWORD_HASH_MAX_PENDING:
+        _rejected += 1
+        raise HasherSaturated(f"{_pending} password hash jobs already in flight")
+
+    _pending += 1
+    try:
+        return await asyncio.get_running_loop().run_in_executor(get_executor(), fn, *args)
+    finally:
+        _pending -= 1
+
+
+def _hash(password, rounds):
+    return bcrypt.hashpw(password.encode(), bcrypt.gensalt(rounds)).decode()
+
+
+def _check(password, hashed):
+    return bcrypt.checkpw(password.encode(), hashed.encode())
+
+
+def hash_rounds(hashed):
+    """Work factor stored in a bcrypt hash ("$2b$12$..." -> 12)"""
+    try:
+        return int(hashed.split("$")[2])
+    except (IndexError, ValueError):
+        return None
+
+
+def needs_rehash(hashed):
+    return hash_rounds(hashed) != BCRYPT_ROUNDS
+
+
+async def hash_password(password):
+    """bcrypt-hash a password at BCRYPT_ROUNDS on the hashing pool"""
+    global _hashed
+    hashed = await _run(_hash, password, BCRYPT_ROUNDS)
+    _hashed += 1
+    return hashed
+
+
+async def verify_password(password, hashed):
+    """
+    Check a password against its stored hash on the hashing pool.
+
+    Returns (valid, new_hash): new_hash is set when the password is valid
+    but was hashed with a different work factor, so the caller can store it.
+    """
+    global _verified, _rehashed
+    valid = await _run(_check, password, hashed)
+    _verified += 1
+    if not valid or not needs_rehash(hashed):
+        return valid, None
+    _rehashed += 1
+    return True, await hash_password(password)
+
+
+def shutdown():
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+def stats():
+    return {
+        "rounds": BCRYPT_ROUNDS,
+        "workers": PASSWORD_HASH_WORKERS,
+        "max_pending": PASSWORD_HASH_MAX_PENDING,
+        "pending": _pending,
+        "hashed": _hashed,
+        "verified": _verified,
+        "rehashed": _rehashed,
+        "rejected": _rejected,
+    }
@@ -1,15 +1,20 @@
 import os
+import asyncio
+import logging
 from dotenv import load_dotenv
 from pathlib import Path
-import requests
-import numpy as np
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
+
+import http_client
+import metrics
+from job_corpus import job_corpus
+from cache import cached, normalize_text
 
 # Ensure .env in the backend directory is loaded when this module is imported
 _env_path = Path(__file__).parent / '.env'
 load_dotenv(_env_path)
 
+logger = logging.getLogger(__name__)
+
 # Load Adzuna API keys from environment
 ADZUNA_APP_ID = os.getenv("ADZUNA_APP_ID")
 ADZUNA_APP_KEY = os.getenv("ADZUNA_APP_KEY")
@@ -18,12 +23,29 @@ ADZUNA_APP_KEY = os.getenv("ADZUNA_APP_KEY")
 YOUTUBE_API_KEY = os.getenv("YOUTUBE_API_KEY", "YOUR_YOUTUBE_API_KEY")
 RAPIDAPI_KEY = os.getenv("RAPIDAPI_KEY", "YOUR_RAPIDAPI_KEY")
 
+# Overall deadline (seconds) for the concurrent course fan-out in get_real_courses
+COURSE_FETCH_DEADLINE = float(os.getenv("COURSE_FETCH_DEADLINE", "8"))
+
+# Result cache lifetimes (seconds) for the paid / rate-limited providers
+JOB_CACHE_TTL = float(os.getenv("JOB_CACHE_TTL", "1800"))
+COURSE_CACHE_TTL = float(os.getenv("COURSE_CACHE_TTL", "21600"))
+
+
+def _job_cache_key(country, query, count):
+    # Adzuna's "what" is an AND of keywords, so token order doesn't matter
+    terms = sorted(set(normalize_text(query).split()))
+    return f"jobs:{normalize_text(country)}:{int(count)}:{' '.join(terms)}"
+
+
+def _course_cache_key(provider):
+    return lambda skill: f"{provider}:{normalize_text(skill)}"
+
 
 # -------------------- REAL JOB FETCHING (ADZUNA) --------------------
-def fetch_real_jobs(country, query, count):
-    """Fetch real jobs from Adzuna API based on country and query"""
+async def fetch_adzuna_page(country, query, count, page=1):
+    """Fetch one page of real jobs from Adzuna API based on country and query"""
     try:
-        url = f"https://api.adzuna.com/v1/api/jobs/{country}/search/1"
+        url = f"https://api.adzuna.com/v1/api/jobs/{country}/search/{page}"
 
         params = {
             "app_id": ADZUNA_APP_ID,
@@ -33,10 +55,10 @@ def fetch_real_jobs(country, query, count):
             "content-type": "application/json"
         }
 
-        response = requests.get(url, params=params, timeout=15)
+        response = await http_client.get(url, params=params, timeout=15, provider="adzuna")
 
         if response.status_code != 200:
-            print("Adzuna API Error:", response.text)
+            logger.warning("Adzuna API error %s: %s", response.status_code, response.text[:200])
             return []
 
         data = response.json()
@@ -54,7 +76,7 @@ def fetch_real_jobs(country, query, count):
             skill_text = (title + " " + description[:300]).lower()
 
             jobs.append({
-                "id": i + 1,
+                "id": (page - 1) * count + i + 1,
                 "title": title,
                 "company": company,
                 "location": location,
@@ -67,63 +89,86 @@ def fetch_real_jobs(country, query, count):
         return jobs
 
     except Exception as e:
-        print("Fetch Jobs Error:", str(e))
+        logger.warning("Fetch jobs error: %s", e)
         return []
 
 
+@cached("adzuna_jobs", key=_job_cache_key, ttl=JOB_CACHE_TTL)
+async def fetch_real_jobs(country, query, count):
+    """Fetch real jobs from Adzuna API based on country and query"""
+    return await fetch_adzuna_page(country, query, count)
+
+
+def start_job_ingestion():
+    """Start the background task that keeps the local job corpus filled from Adzuna"""
+    if not ADZUNA_APP_ID or not ADZUNA_APP_KEY:
+        logger.warning("Adzuna API keys missing in .env; job corpus ingestion disabled")
+        return None
+    return asyncio.ensure_future(job_corpus.run_ingestion(fetch_adzuna_page))
+
+
 # -------------------- UPDATED JOB RECOMMENDER (AI + REAL JOBS) --------------------
-def recommend_jobs(user_skills, top_n=6):
+async def recommend_jobs(user_skills, top_n=6):
     """
     Recommend ONLY Indian jobs using:
-    - Adzuna India API (country = 'in')
-    - TF-IDF AI skill matching
+    - the local Adzuna India job corpus (ingested in the background)
+    - TF-IDF AI skill matching over its persistent index
+    Falls back to a live Adzuna search while the corpus has nothing relevant.
     """
     if not user_skills:
         return []
 
-    # Check API keys
-    if not ADZUNA_APP_ID or not ADZUNA_APP_KEY:
-        print("WARNING: Adzuna API keys missing in .env")
-        return []
-
     try:
         # Convert skills into search query
         query = " ".join(user_skills)
 
-        # 🇮🇳 Fetch ONLY Indian jobs (IMPORTANT CHANGE)
-        real_jobs = fetch_real_jobs("in", query, top_n)
-
-        if not real_jobs:
-            print("No Indian jobs found from Adzuna")
+        # The first access reads the stored corpus (and may wait on the ingestion
+        # task's load); do that in a thread, never on the event loop
+        if not job_corpus.loaded:
+            await asyncio.to_thread(job_corpus.ensure_loaded)
+        matches = job_corpus.search(query, top_n)
+        if matches:
+            recommendations = []
+            for rank, (posting, score) in enumerate(matches):
+                job = posting.copy()
+                job.pop("ingested_at", None)
+                job["id"] = rank + 1
+                job["match_score"] = round(score * 100, 2)
+                job["source"] = "India"
+                recommendations.append(job)
+            return recommendations
+
+        # Check API keys
+        if not ADZUNA_APP_ID or not ADZUNA_APP_KEY:
+            logger.warning("Adzuna API keys missing in .env")
             return []
 
-        # ---- AI Matching (your original logic, unchanged) ----
-        user_profile = " ".join(user_skills)
-        job_profiles = [job["skills"] for job in real_jobs]
-        all_documents = [user_profile] + job_profiles
+        # Nothing local yet: cover this query in the next ingestion cycle
+        job_corpus.request_ingest(query)
 
-        vectorizer = TfidfVectorizer(stop_words="english")
-        tfidf_matrix = vectorizer.fit_transform(all_documents)
-
-        user_vector = tfidf_matrix[0:1]
-        job_vectors = tfidf_matrix[1:]
+        # 🇮🇳 Fetch ONLY Indian jobs (IMPORTANT CHANGE)
+        real_jobs = await fetch_real_jobs("in", query, top_n)
 
-        similarities = cosine_similarity(user_vector, job_vectors)[0]
+        if not real_jobs:
+            logger.info("No Indian jobs found from Adzuna")
+            return []
 
-        # Sort by best match
-        top_indices = np.argsort(similarities)[::-1][:top_n]
+        # ---- AI Matching over the live results ----
+        from vector_index import TfidfIndex
+        live_index = TfidfIndex(stop_words="english")
+        live_index.add(range(len(real_jobs)), [job["skills"] for job in real_jobs])
 
         recommendations = []
-        for idx in top_indices:
+        for idx, score in live_index.search(query, top_n):
             job = real_jobs[idx].copy()
-            job["match_score"] = round(similarities[idx] * 100, 2)
+            job["match_score"] = round(score * 100, 2)
             job["source"] = "India"
             recommendations.append(job)
 
         return recommendations
 
     except Exception as e:
-        print("Recommendation Error:", str(e))
+        logger.warning("Recommendation error: %s", e)
         return []
 
 
@@ -150,33 +195,57 @@ COURSE_LISTINGS = [
 ]
 
 
-def recommend_courses(user_skills, target_skills, budget_max=200, top_n=5):
-    """Recommend courses based on skill gap (unchanged)"""
+# Fitted once on first use (vector_index pulls in sklearn); add_course_listings() extends it incrementally
+_course_index = None
+
+
+def get_course_index():
+    global _course_index
+    if _course_index is None:
+        from vector_index import TfidfIndex
+        index = TfidfIndex()
+        index.add(range(len(COURSE_LISTINGS)), [course['skills'] for course in COURSE_LISTINGS])
+        _course_index = index.refresh()
+    return _course_index
+
+
+def add_course_listings(courses):
+    """Append courses to COURSE_LISTINGS and index them without refitting the corpus"""
+    start = len(COURSE_LISTINGS)
+    COURSE_LISTINGS.extend(courses)
+    if _course_index is not None:
+        _course_index.add(range(start, len(COURSE_LISTINGS)), [course['skills'] for course in courses])
+        _course_index.refresh()
+
+
+def _gap_profile(user_skills, target_skills):
     missing_skills = [skill for skill in target_skills if skill not in user_skills]
 
     if not missing_skills:
         missing_skills = ['advanced programming', 'leadership']
 
-    gap_profile = ' '.join(missing_skills)
-    course_profiles = [course['skills'] for course in COURSE_LISTINGS]
-    all_documents = [gap_profile] + course_profiles
+    return ' '.join(missing_skills)
 
-    vectorizer = TfidfVectorizer()
-    tfidf_matrix = vectorizer.fit_transform(all_documents)
 
-    gap_vector = tfidf_matrix[0:1]
-    course_vectors = tfidf_matrix[1:]
-    similarities = cosine_similarity(gap_vector, course_vectors)[0]
+def recommend_courses_batch(skill_pairs, top_n=5):
+    """Recommend courses for many (user_skills, target_skills) pairs in one scoring pass"""
+    gap_profiles = [_gap_profile(user_skills, target_skills) for user_skills, target_skills in skill_pairs]
 
-    top_indices = np.argsort(similarities)[::-1][:top_n]
+    results = []
+    for matches in get_course_index().search_many(gap_profiles, top_n=top_n):
+        recommendations = []
+        for idx, score in matches:
+            course = COURSE_LISTINGS[idx].copy()
+            course['relevance_score'] = round(score * 100, 2)
+            recommendations.append(course)
+        results.append(recommendations)
 
-    recommendations = []
-    for idx in top_indices:
-        course = COURSE_LISTINGS[idx].copy()
-        course['relevance_score'] = round(similarities[idx] * 100, 2)
-        recommendations.append(course)
+    return results
 
-    return recommendations
+
+def recommend_courses(user_skills, target_skills, budget_max=200, top_n=5):
+    """Recommend courses based on skill gap"""
+    return recommend_courses_batch([(user_skills, target_skills)], top_n=top_n)[0]
 
 
 def generate_learning_path(user_skills, target_role, resume_data=None):
@@ -288,7 +357,7 @@ def generate_learning_path(user_skills, target_role, resume_data=None):
     }
 
 
-def get_real_courses(skills):
+async def get_real_courses(skills):
     """
     Get real course recommendations from YouTube and Udemy APIs.
     Returns courses based on detected skills with fallback to COURSE_LISTINGS.
@@ -306,19 +375,33 @@ def get_real_courses(skills):
     has_youtube_api = bool(YOUTUBE_API_KEY and YOUTUBE_API_KEY != "YOUR_YOUTUBE_API_KEY")
     has_rapidapi_key = bool(RAPIDAPI_KEY and RAPIDAPI_KEY != "YOUR_RAPIDAPI_KEY")
 
-    print(f"get_real_courses: has_youtube_api={has_youtube_api}, has_rapidapi_key={has_rapidapi_key}, top_skills={top_skills}")
+    logger.debug("get_real_courses: has_youtube_api=%s, has_rapidapi_key=%s, top_skills=%s",
+                 has_youtube_api, has_rapidapi_key, top_skills)
 
+    # Issue every (skill, provider) fetch at once; keep the original order for merging
+    fetches = []
     for skill in top_skills:
         if has_youtube_api:
-            youtube = get_youtube_courses(skill)
-            print(f"YouTube returned {len(youtube)} items for skill={skill}")
-            courses.extend(youtube)
-
+            fetches.append(("YouTube", skill, asyncio.ensure_future(get_youtube_courses(skill))))
         if has_rapidapi_key:
-            udemy = get_udemy_courses(skill)
-            print(f"Udemy(RapidAPI) returned {len(udemy)} items for skill={skill}")
-            courses.extend(udemy)
-    
+            fetches.append(("Udemy(RapidAPI)", skill, asyncio.ensure_future(get_udemy_courses(skill))))
+
+    if fetches:
+        with metrics.stage("course_fetch"):
+            done, pending = await asyncio.wait([task for _, _, task in fetches], timeout=COURSE_FETCH_DEADLINE)
+        for task in pending:
+            task.cancel()
+
+        for provider, skill, task in fetches:
+            if task not in done:
+                logger.warning("%s missed the %ss deadline for skill=%s", provider, COURSE_FETCH_DEADLINE, skill)
+                continue
+            if task.exception() is not None:
+                logger.warning("%s failed for skill=%s: %s", provider, skill, task.exception())
+                continue
+            logger.debug("%s returned %d items for skill=%s", provider, len(task.result()), skill)
+            courses.extend(task.result())
+
     # Fallback to COURSE_LISTINGS if no API courses found
     # Helper: normalize course fields (link, thumbnail, platform)
     def normalize_course(c):
@@ -385,7 +468,8 @@ def get_real_courses(skills):
         unique_courses.append(nc)
 
     if not unique_courses:
-        print(f"API keys not configured or API failed. Using fallback courses for '{main_skill}'")
+        main_skill = top_skills[0]
+        logger.info("API keys not configured or API failed. Using fallback courses for '%s'", main_skill)
         # Filter COURSE_LISTINGS by skill relevance
         for course in COURSE_LISTINGS:
             if main_skill.lower() in course.get('skills', '').lower():
@@ -396,8 +480,6 @@ def get_real_courses(skills):
             unique_courses = [normalize_course(c) for c in COURSE_LISTINGS[:3]]
 
     return unique_courses
-    
-    return courses
 
 
 def convert_usd_to_inr(price_usd):
@@ -410,7 +492,8 @@ def convert_usd_to_inr(price_usd):
         return "₹0"
 
 
-def get_youtube_courses(skill):
+@cached("youtube_courses", key=_course_cache_key("youtube"), ttl=COURSE_CACHE_TTL)
+async def get_youtube_courses(skill):
     """Fetch courses from YouTube API"""
     try:
         url = "https://www.googleapis.com/youtube/v3/search"
@@ -423,8 +506,8 @@ def get_youtube_courses(skill):
             "type": "video"
         }
 
-        response = requests.get(url, params=params, timeout=10)
-        print(f"YouTube API status: {response.status_code}")
+        response = await http_client.get(url, params=params, timeout=10, provider="youtube")
+        logger.debug("YouTube API status: %s", response.status_code)
         data = response.json()
 
         courses = []
@@ -444,11 +527,12 @@ def get_youtube_courses(skill):
 
         return courses
     except Exception as e:
-        print(f"YouTube API Error: {e}")
+        logger.warning("YouTube API error: %s", e)
         return []
 
 
-def get_udemy_courses(skill):
+@cached("udemy_courses", key=_course_cache_key("udemy"), ttl=COURSE_CACHE_TTL)
+async def get_udemy_courses(skill):
     """Fetch courses from Udemy API via RapidAPI"""
     try:
         url = "https://udemy-course-scraper-api.p.rapidapi.com/search"
@@ -462,11 +546,11 @@ def get_udemy_courses(skill):
             "query": skill
         }
 
-        response = requests.get(url, headers=headers, params=params, timeout=10)
-        print(f"Udemy RapidAPI status: {response.status_code}")
+        response = await http_client.get(url, headers=headers, params=params, timeout=10, provider="rapidapi")
+        logger.debug("Udemy RapidAPI status: %s", response.status_code)
         # Dump a small part of response for debugging if non-200
         if response.status_code != 200:
-            print("Udemy RapidAPI response:", response.text[:500])
+            logger.warning("Udemy RapidAPI response %s: %s", response.status_code, response.text[:500])
         data = response.json()
 
         courses = []
@@ -488,5 +572,5 @@ def get_udemy_courses(skill):
 
         return courses
     except Exception as e:
-        print(f"Udemy API Error: {e}")
+        logger.warning("Udemy API error: %s", e)
         return []
\ No newline at end of file
@@ -0,0 +1,314 @@
+"""
+Pluggable sentiment engines for resume text.
+
+    python sentiment.py resume.txt other.pdf   # compare the lexicon engine with TextBlob
+
+SENTIMENT_BACKEND=lexicon (default) scores polarity from TextBlob's English
+sentiment lexicon compiled once into a flat dict, with the same
+tokenisation, modifier/negation rules and averaging as TextBlob's
+PatternAnalyzer, so polarities are identical without importing TextBlob
+(and NLTK) or building a TextBlob per call. SENTIMENT_BACKEND=textblob
+uses TextBlob itself.
+"""
+import importlib.util
+import os
+import re
+import sys
+import threading
+from xml.etree import ElementTree
+
+# -------------------- CONFIGURATION --------------------
+SENTIMENT_BACKEND = os.getenv("SENTIMENT_BACKEND", "lexicon").lower()
+
+# -------------------- TOKENISER CONSTANTS --------------------
+# Same values as textblob._text (find_tokens and Sentiment.assessments)
+PUNCTUATION = ".,;:!?()[]{}`''\"@#$^&*+-|=~_"
+LEADING_PUNCTUATION = tuple(PUNCTUATION.replace(".", ""))
+TRAILING_PUNCTUATION = LEADING_PUNCTUATION + (".",)
+EOS = "END-OF-SENTENCE"
+RE_PARAGRAPH = re.compile(r"\n{2,}")
+# Trailing marks that are always split off (a trailing "." may end an abbreviation)
+SIMPLE_TRAILING = frozenset(",;:!?)]}\"'")
+SENTENCE_END = ("...", ".", "!", "?", EOS)
+SENTENCE_TAIL = ("'", '"', "”", "’", "...", ".", "!", "?", ")", EOS)
+ABBREVIATIONS = {
+    "a.", "adj.", "adv.", "al.", "a.m.", "c.", "cf.", "comp.", "conf.", "def.", "ed.", "e.g.", "esp.",
+    "etc.", "ex.", "f.", "fig.", "gen.", "id.", "i.e.", "int.", "l.", "m.", "Med.", "Mil.", "Mr.", "n.",
+    "n.q.", "orig.", "pl.", "pred.", "pres.", "p.m.", "ref.", "v.", "vs.", "w/",
+}
+RE_ABBREVIATION = re.compile(r"^[A-Za-z]\.$|^([A-Za-z]\.)+$|^[A-Z][" + "|".join("bcdfghjklmnpqrstvwxz") + "]+.$")
+RE_CONTRACTION = re.compile(r"'d|'m|'s|'ll|'re|'ve|n't")
+RE_SARCASM = re.compile(r"\( ?\! ?\)")
+EMOTICONS = {
+    ("love", +1.00): ("<3", "♥"),
+    ("grin", +1.00): (">:D", ":-D", ":D", "=-D", "=D", "X-D", "x-D", "XD", "xD", "8-D"),
+    ("taunt", +0.75): (">:P", ":-P", ":P", ":-p", ":p", ":-b", ":b", ":c)", ":o)", ":^)"),
+    ("smile", +0.50): (">:)", ":-)", ":)", "=)", "=]", ":]", ":}", ":>", ":3", "8)", "8-)"),
+    ("wink", +0.25): (">;]", ";-)", ";)", ";-]", ";]", ";D", ";^)", "*-)", "*)"),
+    ("gasp", +0.05): (">:o", ":-O", ":O", ":o", ":-o", "o_O", "o.O", "°O°", "°o°"),
+    ("worry", -0.25): (">:/", ":-/", ":/", ":\\", ">:\\", ":-.", ":-s", ":s", ":S", ":-S", ">.>"),
+    ("frown", -0.75): (">:[", ":-(", ":(", "=(", ":-[", ":[", ":{", ":-<", ":c", ":-c", "=/"),
+    ("cry", -1.00): (":'(", ":'''(", ";'("),
+}
+RE_EMOTICONS = re.compile(r"(%s)($|\s)" % "|".join(
+    r" ?".join(re.escape(char) for char in emoticon) for emoticons in EMOTICONS.values() for emoticon in emoticons
+))
+# Lower-cased emoticon -> polarity (first group wins, as in TextBlob)
+EMOTICON_POLARITY = {}
+for (_, _polarity), _emoticons in EMOTICONS.items():
+    for _emoticon in _emoticons:
+        EMOTICON_POLARITY.setdefault(_emoticon.lower(), _polarity)
+
+NEGATIONS = ("no", "not", "n't", "never")
+MODIFIER_POS = "RB"
+
+
+def tokenize(text):
+    """Lower-cased word/punctuation tokens exactly as TextBlob's PatternAnalyzer sees them"""
+    text = RE_CONTRACTION.sub(lambda m: " " + m.group(), text)
+    text = (text.replace("“", " “ ").replace("”", " ” ").replace("‘", " ‘ ")
+            .replace("’", " ’ ").replace("'", " ' ").replace('"', ' " '))
+    # Blank lines end a sentence
+    text = RE_PARAGRAPH.sub(" " + EOS + " ", text.replace("\r\n", "\n"))
+
+    tokens = []
+    for token in text.split():
+        if token.isalnum():
+            tokens.append(token)
+            continue
+        if token[-1] in SIMPLE_TRAILING and token[:-1].isalnum():
+            tokens.append(token[:-1])
+            tokens.append(token[-1])
+            continue
+        while token.startswith(LEADING_PUNCTUATION):
+            tokens.append(token[0])
+            token = token[1:]
+        tail = []
+        while token.endswith(TRAILING_PUNCTUATION):
+            if token.endswith(LEADING_PUNCTUATION):
+                tail.append(token[-1])
+                token = token[:-1]
+            if token.endswith("..."):
+                tail.append("...")
+                token = token[:-3].rstrip(".")
+            if token.endswith("."):
+                if token in ABBREVIATIONS or RE_ABBREVIATION.match(token):
+                    break
+                tail.append(".")
+                token = token[:-1]
+        if token:
+            tokens.append(token)
+        tokens.extend(reversed(tail))
+
+    # Sarcasm marks and emoticons are re-joined within a sentence; most texts have neither
+    joined = " ".join(token for token in tokens if token != EOS)
+    if not RE_SARCASM.search(joined) and not RE_EMOTICONS.search(joined):
+        return joined.lower().split()
+
+    # Newlines between sentences keep both patterns (which only allow spaces) from spanning them
+    text = "\n".join(_sentences(tokens))
+    text = RE_SARCASM.sub("(!)", text)
+    text = RE_EMOTICONS.sub(lambda m: m.group(1).replace(" ", "") + m.group(2), text)
+    return text.lower().split()
+
+
+def _sentences(tokens):
+    """Space-joined sentences; a sentence ends at . ! ? ... or a blank line plus any closing marks"""
+    i, j = 0, 0
+    while j < len(tokens):
+        if tokens[j] in SENTENCE_END:
+            # TextBlob stops at the first quote mark here (its balanced-quote check always sees 0)
+            while j < len(tokens) and tokens[j] in SENTENCE_TAIL and tokens[j] not in ("'", '"'):
+                j += 1
+            sentence = [token for token in tokens[i:j] if token != EOS]
+            if sentence:
+                yield " ".join(sentence)
+            i = j
+        j += 1
+    if tokens[i:]:
+        yield " ".join(tokens[i:])
+
+
+# -------------------- LEXICON --------------------
+def _average(values):
+    return sum(values) / float(len(values) or 1)
+
+
+def lexicon_path():
+    spec = importlib.util.find_spec("textblob")
+    if spec is None or not spec.submodule_search_locations:
+        raise RuntimeError("textblob is not installed; its en-sentiment.xml provides the sentiment lexicon")
+    return os.path.join(spec.submodule_search_locations[0], "en", "en-sentiment.xml")
+
+
+def compile_lexicon(path=None):
+    """Return {word: (polarity, subjectivity, intensity, is_modifier)} built like TextBlob's English Sentiment"""
+    words = {}
+    for node in ElementTree.parse(path or lexicon_path()).getroot().findall("word"):
+        form = node.attrib.get("form")
+        if form:
+            scores = (float(node.attrib.get("polarity", 0.0)), float(node.attrib.get("subjectivity", 0.0)),
+                      float(node.attrib.get("intensity", 1.0)))
+            words.setdefault(form, {}).setdefault(node.attrib.get("pos"), []).append(scores)
+
+    # Average every sense per part of speech, then across parts of speech
+    for form, senses in words.items():
+        words[form] = {pos: [_average(column) for column in zip(*scores)] for pos, scores in senses.items()}
+    for form, by_pos in words.items():
+        by_pos[None] = [_average(column) for column in zip(*by_pos.values())]
+
+    # "terrible" -> adverb "terribly"
+    for form, by_pos in list(words.items()):
+        if "JJ" in by_pos:
+            stem = form[:-1] + "i" if form.endswith("y") else form
+            stem = stem[:-2] if stem.endswith("le") else stem
+            adverb = words.setdefault(stem + "ly", {})
+            adverb[MODIFIER_POS] = adverb[None] = tuple(by_pos["JJ"])
+
+    return {form: tuple(by_pos[None]) + (MODIFIER_POS in by_pos,) for form, by_pos in words.items()}
+
+
+# -------------------- ENGINES --------------------
+class LexiconSentiment:
+    """Polarity from a precompiled lexicon (TextBlob PatternAnalyzer rules, no TextBlob objects)"""
+
+    name = "lexicon"
+
+    def __init__(self, path=None):
+        self.path = path
+        self._lexicon = None
+        self._lock = threading.Lock()
+
+    def load(self):
+        if self._lexicon is None:
+            with self._lock:
+                if self._lexicon is None:
+                    self._lexicon = compile_lexicon(self.path)
+        return self
+
+    def polarity(self, text):
+        if self._lexicon is None:
+            self.load()
+        lexicon = self._lexicon
+
+        # Each assessment is [polarity, intensity, negated]
+        assessments = []
+        modifier = None
+        negation = None
+        for word in tokenize(text):
+            entry = lexicon.get(word)
+            if entry is not None:
+                polarity, _, intensity, is_modifier = entry
+                if modifier is None:
+                    assessments.append([polarity, intensity, False])
+                else:
+                    last = assessments[-1]
+                    last[0] = max(-1.0, min(polarity * last[1], +1.0))
+                    last[1] = intensity
+                if negation is not None:
+                    assessments[-1][1] = 1.0 / assessments[-1][1]
+                    assessments[-1][2] = True
+                modifier = word if is_modifier else None
+                negation = word if word in NEGATIONS else None
+                continue
+
+            if word in NEGATIONS:
+                negation = word
+            elif negation and len(word.strip("'")) > 1:
+                negation = None
+            if negation is not None and modifier is not None and modifier.endswith("ly"):
+                assessments[-1][2] = True
+                negation = None
+            elif modifier and len(word) > 2:
+                modifier = None
+            if word == "!" and assessments:
+                assessments[-1][0] = max(-1.0, min(assessments[-1][0] * 1.25, +1.0))
+            if word == "(!)":
+                assessments.append([0.0, 1.0, False])
+            if not word.isalpha() and len(word) <= 5 and word not in PUNCTUATION and word in EMOTICON_POLARITY:
+                assessments.append([EMOTICON_POLARITY[word], 1.0, False])
+
+        return _average([p * -0.5 if negated else p for p, _, negated in assessments])
+
+    def polarities(self, texts):
+        self.load()
+        return [self.polarity(text) for text in texts]
+
+
+class TextBlobSentiment:
+    """TextBlob's PatternAnalyzer (reference implementation)"""
+
+    name = "textblob"
+
+    def load(self):
+        from textblob import TextBlob
+        TextBlob("").sentiment
+        return self
+
+    def polarity(self, text):
+        from textblob import TextBlob
+        return TextBlob(text).sentiment.polarity
+
+    def polarities(self, texts):
+        return [self.polarity(text) for text in texts]
+
+
+ENGINES = {
+    LexiconSentiment.name: LexiconSentiment,
+    TextBlobSentiment.name: TextBlobSentiment,
+}
+
+_engine = None
+
+
+def get_engine():
+    """The engine selected by SENTIMENT_BACKEND, created on first use"""
+    global _engine
+    if _engine is None:
+        if SENTIMENT_BACKEND not in ENGINES:
+            raise ValueError(f"Unknown SENTIMENT_BACKEND '{SENTIMENT_BACKEND}' (expected one of {sorted(ENGINES)})")
+        _engine = ENGINES[SENTIMENT_BACKEND]()
+    return _engine
+
+
+def polarity(text):
+    return get_engine().polarity(text)
+
+
+def polarities(texts):
+    """Polarity of many texts in one call"""
+    return get_engine().polarities(texts)
+
+
+def check_parity(texts, tolerance=1e-9):
+    """Compare the lexicon engine with TextBlob; returns counts, max difference and mismatching indexes"""
+    expected = TextBlobSentiment().polarities(texts)
+    actual = LexiconSentiment().polarities(texts)
+    diffs = [abs(a - b) for a, b in zip(actual, expected)]
+    return {
+        "texts": len(texts),
+        "max_abs_diff": max(diffs, default=0.0),
+        "mismatches": [i for i, diff in enumerate(diffs) if diff > tolerance],
+    }
+
+
+if __name__ == "__main__":
+    paths = sys.argv[1:]
+    if not paths:
+        sys.exit("usage: python sentiment.py FILE [FILE ...]  (text or PDF resumes)")
+
+    texts = []
+    for path in paths:
+        if path.lower().endswith(".pdf"):
+            from nlp_utils import extract_text_from_pdf
+            with open(path, "rb") as f:
+                texts.append(extract_text_from_pdf(f))
+        else:
+            with open(path, encoding="utf-8", errors="replace") as f:
+                texts.append(f.read())
+
+    report = check_parity(texts)
+    print(f"{report['texts']} texts, max |lexicon - textblob| = {report['max_abs_diff']:.2e}")
+    for i in report["mismatches"]:
+        print(f"  mismatch: {paths[i]}")
+    sys.exit(1 if report["mismatches"] else 0)
@@ -1,47 +1,75 @@
-from fastapi import FastAPI, APIRouter, HTTPException, Depends, UploadFile, File, Form
+from fastapi import FastAPI, APIRouter, HTTPException, Depends, UploadFile, File, Form, Request
+from fastapi.responses import PlainTextResponse, StreamingResponse
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
-from motor.motor_asyncio import AsyncIOMotorClient
 import os
 import logging
 from pathlib import Path
 from pydantic import BaseModel, ConfigDict
-from typing import List, Optional
+from typing import List, Optional, Union
 import uuid
 from datetime import datetime, timezone, timedelta
-import bcrypt
-from jose import JWTError, jwt
-import requests
-import io
+from jose import ExpiredSignatureError, JWTError, jwt
+import hashlib
+import importlib.util
 import json
-
-from ml_model import predict_career_success, predict_resume_score
-from nlp_utils import analyze_resume, extract_resume_features, extract_text_from_pdf, extract_skills
-try:
-    import PyPDF2
-except Exception:
-    PyPDF2 = None
-from recommendation_engine import recommend_jobs, generate_learning_path, get_real_courses, get_youtube_courses, get_udemy_courses
-from database import users_collection, resume_collection
+import shutil
+import asyncio
+import tempfile
+import time
+import zipfile
+
+from ml_model import predict_career_success_batch, MODEL_BACKEND, RESUME_MODEL
+from ml_model import registry as model_registry
+from nlp_utils import RESUME_FEATURE_NAMES
+# PyPDF2 itself is imported by the analysis workers on first use
+PDF_SUPPORT = importlib.util.find_spec("PyPDF2") is not None
+from recommendation_engine import recommend_jobs, generate_learning_path, get_real_courses, get_youtube_courses, get_udemy_courses, start_job_ingestion
+from database import client, users_collection, resume_collection, ensure_indexes
+from pymongo.errors import DuplicateKeyError
+import http_client
+import chat
+import analysis_pool
+import passwords
+import counters
+import write_behind
+import metrics
+import circuit_breaker
+import cache
+from passwords import HasherSaturated
+from cache import TTLCache
+from job_corpus import job_corpus
+from analysis_pool import PoolSaturated, score_resume_text, extract_pdf_text, resume_features, score_feature_rows
 
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
-# Lyzr config
-LYZR_API_KEY = os.environ.get("LYZR_API_KEY")
-LYZR_AGENT_ID = os.environ.get("LYZR_AGENT_ID")
-
-# MongoDB connection
-mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
-db = client[os.environ['DB_NAME']]
-
 # JWT configuration
 SECRET_KEY = os.environ.get('JWT_SECRET_KEY', 'your-secret-key-change-in-production')
 ALGORITHM = 'HS256'
 ACCESS_TOKEN_EXPIRE_MINUTES = 60 * 24  # 24 hours
+# Verified tokens kept in memory (each entry expires with its token's exp)
+JWT_CACHE_MAXSIZE = int(os.environ.get('JWT_CACHE_MAXSIZE', 10000))
+
+# Resume upload limits
+MAX_UPLOAD_BYTES = int(os.environ.get('MAX_UPLOAD_BYTES', 10 * 1024 * 1024))
+UPLOAD_CHUNK_BYTES = 1024 * 1024
+BATCH_MAX_RESUMES = int(os.environ.get('BATCH_MAX_RESUMES', 200))
+BATCH_POOL_RETRIES = 20
+
+# Identical resumes (same PDF bytes or same text) reuse a stored analysis for this long
+RESUME_MEMO_TTL = float(os.environ.get('RESUME_MEMO_TTL', 24 * 3600))
+RESUME_MEMO_MAXSIZE = int(os.environ.get('RESUME_MEMO_MAXSIZE', 2048))
+
+# Max profiles per batch /api/predict call
+PREDICT_BATCH_MAX = int(os.environ.get('PREDICT_BATCH_MAX', 1000))
+
+# Startup prewarm of lazily imported models/dependencies:
+# "background" (default) warms up after the server is accepting requests,
+# "blocking" finishes warming up before it binds, "off" leaves it to first use
+STARTUP_PREWARM = os.environ.get('STARTUP_PREWARM', 'background').lower()
 
 # Create the main app
 app = FastAPI()
@@ -58,6 +86,74 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+
+@app.middleware("http")
+async def record_request_latency(request: Request, call_next):
+    # Time to the response start: for streamed responses (NDJSON batch, SSE chat) that is TTFB
+    started = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        # Route template, not the raw path, so path parameters don't explode the label set
+        route = getattr(request.scope.get("route"), "path", "unmatched")
+        metrics.REQUEST_LATENCY.observe(time.perf_counter() - started, method=request.method, route=route, status=status)
+
+
+def _prewarm_in_process():
+    """Load what the in-process endpoints use lazily: NLP dependencies, course index and models"""
+    import nlp_utils
+    from ml_model import load_models
+    from model_registry import ModelNotAvailable
+    from recommendation_engine import get_course_index
+    nlp_utils.preload()
+    get_course_index()
+    try:
+        load_models()
+    except ModelNotAvailable as e:
+        logging.warning(f"Prewarm skipped models: {e}")
+
+
+async def _prewarm():
+    started = asyncio.get_running_loop().time()
+    try:
+        await asyncio.gather(asyncio.to_thread(_prewarm_in_process), analysis_pool.prewarm())
+        logging.info(f"Prewarm finished in {asyncio.get_running_loop().time() - started:.2f}s")
+    except Exception as e:
+        logging.warning(f"Prewarm failed: {e}")
+
+
+async def _bootstrap_database():
+    await ensure_indexes()
+    await counters.seed()
+
+
+@app.on_event("startup")
+async def start_background_tasks():
+    app.state.db_bootstrap = asyncio.ensure_future(_bootstrap_database())
+    write_behind.start()
+    app.state.job_ingestion = start_job_ingestion()
+    app.state.prewarm = None
+    if STARTUP_PREWARM == "blocking":
+        await _prewarm()
+    elif STARTUP_PREWARM == "background":
+        app.state.prewarm = asyncio.ensure_future(_prewarm())
+
+
+@app.on_event("shutdown")
+async def close_http_client():
+    if getattr(app.state, "job_ingestion", None) is not None:
+        app.state.job_ingestion.cancel()
+    if getattr(app.state, "prewarm", None) is not None:
+        app.state.prewarm.cancel()
+    await write_behind.stop()
+    await http_client.close()
+    analysis_pool.shutdown()
+    passwords.shutdown()
+    client.close()
+
 # ── Models ──────────────────────────────────────────────────────────────────
 
 class UserCreate(BaseModel):
@@ -100,28 +196,87 @@ def create_access_token(data: dict):
     return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
 
 
-async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
+# Verified JWT claims keyed by token
+token_cache = TTLCache("jwt_tokens", maxsize=JWT_CACHE_MAXSIZE)
+
+
+def verify_token(token: str):
+    """Return the token's verified claims, decoding it only on the first request that presents it.
+
+    Raises ExpiredSignatureError / JWTError like jwt.decode.
+    """
+    claims = token_cache.get(token)
+    if claims is not None:
+        return claims
+    claims = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    ttl = claims.get("exp", 0) - time.time()
+    if ttl > 0:
+        token_cache.set(token, claims, ttl=ttl)
+    return claims
+
+
+class UserContext:
+    """The authenticated user of one request; lookups made through it hit the DB at most once per request"""
+
+    def __init__(self, user_id: str, claims: dict):
+        self.user_id = user_id
+        self.claims = claims
+        self._latest_resume = None
+        self._latest_resume_loaded = False
+
+    async def latest_resume_insights(self):
+        """Result of the user's most recent full resume analysis, or None"""
+        if not self._latest_resume_loaded:
+            self._latest_resume_loaded = True
+            try:
+                latest_resume = await resume_collection.find_one(
+                    {"user_id": self.user_id, "result": {"$exists": True}},
+                    projection={"result": 1},
+                    sort=[("created_at", -1)]
+                )
+                if latest_resume:
+                    self._latest_resume = latest_resume.get("result")
+            except Exception as e:
+                logging.warning(f"Could not fetch resume insights: {e}")
+        return self._latest_resume
+
+
+def _user_context(request: Request, token: str):
+    claims = verify_token(token)
+    user_id = claims.get("sub")
+    if user_id is None:
+        raise JWTError("Token has no subject")
+    request.state.user = UserContext(user_id, claims)
+    return request.state.user
+
+
+async def get_user_context(request: Request, credentials: HTTPAuthorizationCredentials = Depends(security)):
     try:
-        payload = jwt.decode(credentials.credentials, SECRET_KEY, algorithms=[ALGORITHM])
-        user_id = payload.get("sub")
-        if user_id is None:
-            raise HTTPException(status_code=401, detail="Invalid token")
-        return user_id
-    except jwt.ExpiredSignatureError:
+        return _user_context(request, credentials.credentials)
+    except ExpiredSignatureError:
         raise HTTPException(status_code=401, detail="Token expired")
-    except jwt.InvalidTokenError:
+    except JWTError:
         raise HTTPException(status_code=401, detail="Invalid token")
 
 
-async def get_current_user_optional(credentials: HTTPAuthorizationCredentials = Depends(security_optional)):
+async def get_user_context_optional(request: Request, credentials: HTTPAuthorizationCredentials = Depends(security_optional)):
+    """Like get_user_context, but guests (no token, or an invalid/expired one) get None"""
     if credentials is None:
         return None
     try:
-        payload = jwt.decode(credentials.credentials, SECRET_KEY, algorithms=[ALGORITHM])
-        return payload.get("sub")
-    except Exception:
+        return _user_context(request, credentials.credentials)
+    except JWTError as e:
+        logging.info(f"Ignoring unusable bearer token on optional-auth route: {e}")
         return None
 
+
+async def get_current_user(user: UserContext = Depends(get_user_context)):
+    return user.user_id
+
+
+async def get_current_user_optional(user: Optional[UserContext] = Depends(get_user_context_optional)):
+    return user.user_id if user else None
+
 # ── Auth Routes ───────────────────────────────────────────────────────────────
 
 @api_router.get("/")
@@ -129,6 +284,14 @@ async def root():
     return {"message": "Career Success & Recommendation Platform API"}
 
 
+def _auth_busy():
+    return HTTPException(
+        status_code=429,
+        detail="Too many sign-in attempts right now, please retry shortly",
+        headers={"Retry-After": "1"},
+    )
+
+
 @api_router.post("/auth/signup")
 async def signup(user_data: UserCreate):
     """Register a new user. Accepts JSON body with email, password, name."""
@@ -136,14 +299,22 @@ async def signup(user_data: UserCreate):
     if existing:
         raise HTTPException(status_code=400, detail="User already exists")
 
-    hashed_password = bcrypt.hashpw(user_data.password.encode(), bcrypt.gensalt()).decode()
+    try:
+        hashed_password = await passwords.hash_password(user_data.password)
+    except HasherSaturated:
+        raise _auth_busy()
     user_doc = {
         "email": user_data.email,
         "password": hashed_password,
         "name": user_data.name,
         "created_at": datetime.utcnow()
     }
-    result = await users_collection.insert_one(user_doc)
+    try:
+        result = await users_collection.insert_one(user_doc)
+    except DuplicateKeyError:
+        # Lost a race with a concurrent signup for the same email (users.email is unique)
+        raise HTTPException(status_code=400, detail="User already exists")
+    await counters.increment(users=1)
 
     token = create_access_token({"sub": str(result.inserted_id)})
     return {
@@ -163,9 +334,20 @@ async def login(user_data: UserLogin):
     if not user:
         raise HTTPException(status_code=401, detail="Invalid email or password")
 
-    if not bcrypt.checkpw(user_data.password.encode(), user["password"].encode()):
+    try:
+        valid, new_hash = await passwords.verify_password(user_data.password, user["password"])
+    except HasherSaturated:
+        raise _auth_busy()
+    if not valid:
         raise HTTPException(status_code=401, detail="Invalid email or password")
 
+    # Stored hash used an old work factor: upgrade it to BCRYPT_ROUNDS
+    if new_hash:
+        try:
+            await users_collection.update_one({"_id": user["_id"]}, {"$set": {"password": new_hash}})
+        except Exception:
+            logging.warning("Could not store re-hashed password; continuing")
+
     token = create_access_token({"sub": str(user["_id"])})
     return {
         "access_token": token,
@@ -179,107 +361,60 @@ async def login(user_data: UserLogin):
 # ── AI Chat ───────────────────────────────────────────────────────────────────
 
 @api_router.post("/chat")
-async def chat_endpoint(payload: dict):
+async def chat_endpoint(payload: dict, request: Request):
+    """Advisor reply as {"reply": ...}, or as server-sent events with "stream": true / Accept: text/event-stream."""
     message = payload.get("message") if isinstance(payload, dict) else None
     if not message:
         raise HTTPException(status_code=400, detail="No message provided")
 
-    # Fallback demo replies (used if Lyzr is unavailable)
-    demo_replies = {
-        "hello": "Hi there! 👋 I'm your AI Career Advisor. Ask me about resumes, interviews, salary negotiation, or career growth!",
-        "hi":    "Hello! 😊 How can I help with your career today?",
-        "resume": "To improve your resume: 1) Use quantifiable achievements, 2) Add keywords from job descriptions, 3) Use clear sections (Summary, Experience, Skills, Education), 4) Start bullets with action verbs like 'Led', 'Built', 'Optimized'.",
-        "interview": "For interviews: 1) Research the company, 2) Use the STAR method, 3) Prepare achievement examples, 4) Ask thoughtful questions, 5) Send a follow-up thank-you email.",
-        "salary": "Salary tips: 1) Research market rates, 2) Negotiate after the offer, 3) Consider total compensation, 4) Get agreements in writing.",
-        "career": "Career growth: 1) Set clear milestones, 2) Build skills via courses, 3) Network in your field, 4) Find a mentor, 5) Take on stretch projects.",
-        "skill":  "Top skills in 2025: Python, React, AWS, SQL, Machine Learning, Communication, and Project Management.",
-        "job":    "Job search tips: 1) Tailor your resume per role, 2) Apply on company sites directly, 3) Network on LinkedIn, 4) Follow up after 1 week.",
-    }
-    message_lower = message.lower()
-    fallback_reply = next(
-        (v for k, v in demo_replies.items() if k in message_lower),
-        f"Great question! I can help with resume tips, interview prep, salary negotiation, and career growth. Could you be more specific?"
-    )
-
-    # Try Lyzr API
-    if LYZR_API_KEY and LYZR_AGENT_ID:
-        try:
-            response = requests.post(
-                "https://agent-prod.studio.lyzr.ai/v3/inference/chat/",  # ← trailing slash required!
-                json={
-                    "user_id": "careercraft-user",
-                    "agent_id": LYZR_AGENT_ID,
-                    "session_id": "careercraft-session",
-                    "message": message                   # ← "message" not "input"
-                },
-                headers={
-                    "Content-Type": "application/json",
-                    "x-api-key": LYZR_API_KEY
-                },
-                timeout=15
-            )
-            if response.status_code == 200:
-                data = response.json()
-
-                # Lyzr returns: {"response": "{\"result\": {\"message\": \"...\"}}", ...}
-                # The "response" field is a JSON STRING — parse it!
-                raw = data.get("response", "")
-                if raw:
-                    try:
-                        parsed = json.loads(raw)
-                        lyzr_reply = (
-                            parsed.get("result", {}).get("message")
-                            or parsed.get("message")
-                            or parsed.get("output")
-                            or raw
-                        )
-                    except (json.JSONDecodeError, AttributeError):
-                        lyzr_reply = raw  # use raw string if not parseable
-
-                    if lyzr_reply:
-                        logging.info("Lyzr API responded successfully")
-                        return {"reply": lyzr_reply}
-            else:
-                logging.warning(f"Lyzr returned {response.status_code}: {response.text[:200]}")
-
-        except requests.exceptions.ConnectionError:
-            logging.warning("Lyzr DNS resolution failed — using fallback")
-        except requests.exceptions.Timeout:
-            logging.warning("Lyzr request timed out — using fallback")
-        except Exception as e:
-            logging.warning(f"Lyzr API error: {e}")
-
-    return {"reply": fallback_reply}
+    if payload.get("stream") or "text/event-stream" in request.headers.get("accept", ""):
+        return StreamingResponse(
+            chat.stream_reply(message),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        )
+    return {"reply": await chat.reply(message)}
 
 # ── Career Prediction ─────────────────────────────────────────────────────────
 
 @api_router.post("/predict")
-async def predict(input_data: CareerPredictionInput, user_id: Optional[str] = Depends(get_current_user_optional)):
+async def predict(
+    input_data: Union[CareerPredictionInput, List[CareerPredictionInput]],
+    user_id: Optional[str] = Depends(get_current_user_optional)
+):
+    """Predict career success for one profile, or for a list of profiles in one batch."""
+    rows = input_data if isinstance(input_data, list) else [input_data]
+    if not rows:
+        raise HTTPException(status_code=400, detail="No profiles provided")
+    if len(rows) > PREDICT_BATCH_MAX:
+        raise HTTPException(status_code=413, detail=f"At most {PREDICT_BATCH_MAX} profiles per batch")
+
     try:
-        result = predict_career_success(
-            input_data.age,
-            input_data.experience_years,
-            input_data.education_level,
-            input_data.num_skills,
-            input_data.location_tier,
-            input_data.job_changes
-        )
-        if result is None:
+        with metrics.stage("model_predict"):
+            results = predict_career_success_batch([
+                [row.age, row.experience_years, row.education_level, row.num_skills, row.location_tier, row.job_changes]
+                for row in rows
+            ])
+        if results is None:
             raise HTTPException(status_code=500, detail="Career model failed to generate prediction.")
 
-        prediction_doc = {
-            "id": str(uuid.uuid4()),
-            "user_id": user_id or "anonymous",
-            "input": input_data.model_dump(),
-            "result": result,
-            "created_at": datetime.now(timezone.utc).isoformat()
-        }
-        try:
-            await db.predictions.insert_one(prediction_doc)
-        except Exception:
-            logging.warning("Could not save prediction to DB; continuing")
-
-        return result
+        created_at = datetime.now(timezone.utc).isoformat()
+        prediction_docs = [
+            {
+                "id": str(uuid.uuid4()),
+                "user_id": user_id or "anonymous",
+                "input": row.model_dump(),
+                "result": result,
+                "created_at": created_at
+            }
+            for row, result in zip(rows, results)
+        ]
+        # Written (and counted) in the background; the response does not wait on MongoDB
+        write_behind.predictions_buffer.put(*prediction_docs)
+
+        return results if isinstance(input_data, list) else results[0]
+    except HTTPException:
+        raise
     except Exception as e:
         logging.exception("Career prediction error")
         raise HTTPException(status_code=500, detail=f"Career prediction failed: {str(e)}")
@@ -289,7 +424,7 @@ async def predict(input_data: CareerPredictionInput, user_id: Optional[str] = De
 @api_router.post("/recommend_jobs")
 async def recommend_jobs_endpoint(input_data: JobRecommendationInput, user_id: Optional[str] = Depends(get_current_user_optional)):
     try:
-        jobs = recommend_jobs(input_data.skills, top_n=6)
+        jobs = await recommend_jobs(input_data.skills, top_n=6)
         return {"jobs": jobs}
     except Exception as e:
         logging.exception("Job recommendation error")
@@ -298,19 +433,9 @@ async def recommend_jobs_endpoint(input_data: JobRecommendationInput, user_id: O
 # ── Learning Path ─────────────────────────────────────────────────────────────
 
 @api_router.post("/learning_path")
-async def learning_path_endpoint(input_data: LearningPathInput, user_id: Optional[str] = Depends(get_current_user_optional)):
+async def learning_path_endpoint(input_data: LearningPathInput, user: Optional[UserContext] = Depends(get_user_context_optional)):
     try:
-        resume_insights = None
-        if user_id:
-            try:
-                latest_resume = await db.resume_analyses.find_one(
-                    {"user_id": user_id},
-                    sort=[("created_at", -1)]
-                )
-                if latest_resume:
-                    resume_insights = latest_resume.get("result")
-            except Exception as e:
-                logging.warning(f"Could not fetch resume insights: {e}")
+        resume_insights = await user.latest_resume_insights() if user else None
 
         path = generate_learning_path(
             user_skills=input_data.skills,
@@ -326,6 +451,99 @@ async def learning_path_endpoint(input_data: LearningPathInput, user_id: Optiona
 
 # ── Resume Analysis ───────────────────────────────────────────────────────────
 
+def _analysis_busy():
+    return HTTPException(
+        status_code=429,
+        detail="Resume analysis is busy, please retry shortly",
+        headers={"Retry-After": "2"},
+    )
+
+
+def _resume_feedback(score):
+    if score >= 85:
+        return "Excellent Resume 🚀 (Job Ready)"
+    elif score >= 70:
+        return "Strong Resume 👍 (Minor Improvements Needed)"
+    elif score >= 50:
+        return "Average Resume ⚠️ (Add more projects & skills)"
+    return "Weak Resume ❌ (Improve skills, projects and experience)"
+
+
+async def _spool_upload(file: UploadFile):
+    """Stream an upload to a temp file in chunks (capped at MAX_UPLOAD_BYTES); returns (path, sha256 hex)"""
+    spooled = tempfile.NamedTemporaryFile(prefix="resume-", suffix=".pdf", delete=False)
+    try:
+        size = 0
+        digest = hashlib.sha256()
+        while chunk := await file.read(UPLOAD_CHUNK_BYTES):
+            size += len(chunk)
+            if size > MAX_UPLOAD_BYTES:
+                raise HTTPException(status_code=413, detail=f"Resume exceeds {MAX_UPLOAD_BYTES // (1024 * 1024)} MB limit")
+            spooled.write(chunk)
+            digest.update(chunk)
+        spooled.close()
+        return spooled.name, digest.hexdigest()
+    except BaseException:
+        spooled.close()
+        os.unlink(spooled.name)
+        raise
+
+
+# Stored analyses keyed by "<file_hash|content_hash>:<hash>:<model version>"
+resume_memo = TTLCache("resume_analyses", maxsize=RESUME_MEMO_MAXSIZE, ttl=RESUME_MEMO_TTL)
+
+
+def _text_hash(text):
+    """SHA-256 of resume text with whitespace normalised (PDF extractors differ in spacing)"""
+    return hashlib.sha256(" ".join(text.split()).encode("utf-8")).hexdigest()
+
+
+async def _memoised_analysis(field, digest, model_version):
+    """Return the stored {"result", "content_hash"} for a file/content hash from memory, else MongoDB, or None"""
+    key = f"{field}:{digest}:{model_version}"
+    entry = resume_memo.get(key)
+    if entry is not None:
+        return entry
+    try:
+        doc = await resume_collection.find_one(
+            {
+                field: digest,
+                "model_version": model_version,
+                "result": {"$exists": True},
+                "created_at": {"$gte": datetime.utcnow() - timedelta(seconds=RESUME_MEMO_TTL)},
+            },
+            projection={"result": 1, "content_hash": 1},
+            sort=[("created_at", -1)],
+        )
+    except Exception:
+        logging.warning("Could not look up stored resume analysis; recomputing")
+        return None
+    if not doc:
+        return None
+    entry = {"result": doc["result"], "content_hash": doc.get("content_hash")}
+    resume_memo.set(key, entry)
+    return entry
+
+
+def _record_resume_analysis(user_id, result, model_version, content_hash, file_hash, cached):
+    """Queue one analysis event for writing; freshly computed results are stored with it for later duplicates"""
+    resume_doc = {
+        "user_id": user_id or "guest",
+        "resume_score": result["resume_score"],
+        "skills": result["skills"],
+        "feedback": result["feedback"],
+        "courses_count": len(result["courses"]),
+        "content_hash": content_hash,
+        "file_hash": file_hash,
+        "model_version": model_version,
+        "cached": cached,
+        "created_at": datetime.utcnow()
+    }
+    if not cached:
+        resume_doc["result"] = result
+    write_behind.resume_buffer.put(resume_doc)
+
+
 @api_router.post("/analyze-resume")
 async def analyze_resume_endpoint(
     resume_text: Optional[str] = Form(None),
@@ -333,104 +551,256 @@ async def analyze_resume_endpoint(
     user_id: Optional[str] = Depends(get_current_user_optional)
 ):
     """Analyze resume (PDF upload or pasted text) and return ML score + course recommendations."""
+    model_version = model_registry.version(RESUME_MODEL)
+    file_hash = None
+    memo = None
 
-    # Step 1: Extract text
+    # Step 1: Extract text (unless these exact PDF bytes were analysed already)
     text = None
     if resume_text:
         text = resume_text
     elif file:
         if not file.filename.lower().endswith('.pdf'):
             raise HTTPException(status_code=400, detail="Only PDF files are supported")
-        if PyPDF2 is None:
+        if not PDF_SUPPORT:
             raise HTTPException(status_code=500, detail="PyPDF2 not installed in backend")
+        spooled_path, file_hash = await _spool_upload(file)
         try:
-            contents = await file.read()
-            text = extract_text_from_pdf(io.BytesIO(contents))
+            memo = await _memoised_analysis("file_hash", file_hash, model_version)
+            if memo is None:
+                with metrics.stage("pdf_extract"):
+                    text = await analysis_pool.extract_pdf_file(spooled_path)
+        except PoolSaturated:
+            raise _analysis_busy()
         except Exception:
             logging.exception("Failed to read uploaded PDF")
             raise HTTPException(status_code=500, detail="Could not extract text from resume")
+        finally:
+            os.unlink(spooled_path)
     else:
         raise HTTPException(status_code=400, detail="No resume provided")
 
-    if not text or not text.strip():
-        raise HTTPException(status_code=400, detail="Could not extract text from resume")
+    if memo is None:
+        if not text or not text.strip():
+            raise HTTPException(status_code=400, detail="Could not extract text from resume")
+        content_hash = _text_hash(text)
+        memo = await _memoised_analysis("content_hash", content_hash, model_version)
+
+    # Duplicate upload: return the stored analysis, still recording the event
+    if memo is not None:
+        if file_hash:
+            resume_memo.set(f"file_hash:{file_hash}:{model_version}", memo)
+        _record_resume_analysis(user_id, memo["result"], model_version, memo["content_hash"], file_hash, cached=True)
+        return memo["result"]
 
     try:
-        # Step 2: Feature extraction + ML score
-        features = extract_resume_features(text)
-        score = predict_resume_score(features)
+        # Step 2: Feature extraction + ML score (+ skills), off the event loop
+        analysis = await analysis_pool.run(score_resume_text, text)
+        for stage, seconds in analysis["timings"].items():
+            metrics.STAGE_LATENCY.observe(seconds, stage=stage)
+        features = analysis["features"]
+        score = analysis["score"]
 
         # Step 3: Feedback
-        if score >= 85:
-            feedback = "Excellent Resume 🚀 (Job Ready)"
-        elif score >= 70:
-            feedback = "Strong Resume 👍 (Minor Improvements Needed)"
-        elif score >= 50:
-            feedback = "Average Resume ⚠️ (Add more projects & skills)"
-        else:
-            feedback = "Weak Resume ❌ (Improve skills, projects and experience)"
+        feedback = _resume_feedback(score)
 
         # Step 4: Skill extraction
-        detected_skills = extract_skills(text)
+        detected_skills = analysis["skills"]
         if not detected_skills:
             detected_skills = ["programming"]
 
         # Step 5: Real course recommendations
-        courses = get_real_courses(detected_skills)
+        courses = await get_real_courses(detected_skills)
 
         logging.info(f"Detected Skills: {detected_skills}")
         logging.info(f"Real Courses Fetched: {len(courses)}")
 
-        # Step 6: Save to DB (all variables now defined)
-        resume_doc = {
-            "user_id": user_id or "guest",
-            "resume_score": score,
-            "skills": detected_skills,
-            "feedback": feedback,
-            "courses_count": len(courses),
-            "created_at": datetime.utcnow()
-        }
-        try:
-            await resume_collection.insert_one(resume_doc)
-        except Exception:
-            logging.warning("Could not save resume analysis to DB; continuing")
-
-        return {
+        result = {
             "resume_score": score,
             "feedback": feedback,
             "skills": detected_skills,
             "courses": courses,
-            "analysis": {
-                "word_count": features[0],
-                "skills_count": features[1],
-                "has_projects": features[2],
-                "has_education": features[3],
-                "has_experience": features[4],
-            }
+            "analysis": dict(zip(RESUME_FEATURE_NAMES, features))
         }
 
+        # Step 6: Remember the result under both hashes and save to DB
+        model_version = analysis["model_version"]
+        memo = {"result": result, "content_hash": content_hash}
+        resume_memo.set(f"content_hash:{content_hash}:{model_version}", memo)
+        if file_hash:
+            resume_memo.set(f"file_hash:{file_hash}:{model_version}", memo)
+        _record_resume_analysis(user_id, result, model_version, content_hash, file_hash, cached=False)
+
+        return result
+
+    except PoolSaturated:
+        raise _analysis_busy()
     except Exception as e:
         logging.exception("Error analyzing resume")
         raise HTTPException(status_code=500, detail=f"Error analyzing resume: {str(e)}")
 
-# ── Dashboard ─────────────────────────────────────────────────────────────────
+# ── Batch Resume Scoring ──────────────────────────────────────────────────────
 
-@api_router.get('/dashboard')
-async def dashboard_overview():
+def _unpack_zip(zip_path, limit):
+    """Write each PDF inside a zip to its own temp file; returns [(name, path)]"""
+    items = []
     try:
-        predictions_made = await db.predictions.count_documents({}) if 'predictions' in await db.list_collection_names() else 0
-    except Exception:
-        predictions_made = 0
-
+        with zipfile.ZipFile(zip_path) as archive:
+            for member in archive.infolist():
+                if member.is_dir() or not member.filename.lower().endswith('.pdf'):
+                    continue
+                if len(items) >= limit:
+                    raise HTTPException(status_code=413, detail=f"At most {BATCH_MAX_RESUMES} resumes per batch")
+                if member.file_size > MAX_UPLOAD_BYTES:
+                    items.append((member.filename, None))
+                    continue
+                with tempfile.NamedTemporaryFile(prefix="resume-", suffix=".pdf", delete=False) as target:
+                    items.append((member.filename, target.name))
+                    with archive.open(member) as source:
+                        shutil.copyfileobj(source, target, UPLOAD_CHUNK_BYTES)
+    except BaseException:
+        for _, path in items:
+            if path:
+                os.unlink(path)
+        raise
+    return items
+
+
+async def _run_with_retry(fn, *args):
+    """Batch jobs wait for pool capacity instead of failing with 429"""
+    for attempt in range(BATCH_POOL_RETRIES):
+        try:
+            return await analysis_pool.run(fn, *args)
+        except PoolSaturated:
+            await asyncio.sleep(0.25 * (attempt + 1))
+    return await analysis_pool.run(fn, *args)
+
+
+async def _batch_resume_features(item, slots):
+    """Text extraction + feature extraction for one batch item"""
+    index, name, path, text = item
+    async with slots:
+        if text is None:
+            if path is None:
+                raise ValueError("Resume exceeds upload size limit")
+            with metrics.stage("pdf_extract"):
+                text = await _run_with_retry(extract_pdf_text, path)
+        if not text or not text.strip():
+            raise ValueError("Could not extract text from resume")
+        with metrics.stage("feature_extract"):
+            return await _run_with_retry(resume_features, text)
+
+
+async def _stream_batch_results(items, user_id):
+    slots = asyncio.Semaphore(analysis_pool.ANALYSIS_WORKERS)
+    tasks = {asyncio.ensure_future(_batch_resume_features(item, slots)): item for item in items}
     try:
-        resumes_analyzed = await db.analyzed_resumes.count_documents({}) if 'analyzed_resumes' in await db.list_collection_names() else 0
-    except Exception:
-        resumes_analyzed = 0
+        pending = set(tasks)
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+
+            ready, lines = [], []
+            for task in done:
+                index, name, _, _ = tasks[task]
+                if task.exception() is not None:
+                    lines.append({"index": index, "name": name, "error": str(task.exception())})
+                else:
+                    ready.append((index, name, task.result()))
+
+            # Everything that finished in this wave is scored in one predict call
+            if ready:
+                try:
+                    with metrics.stage("model_predict"):
+                        scores = await _run_with_retry(score_feature_rows, [r["features"] for _, _, r in ready])
+                except Exception as e:
+                    # The 200 is already out: report the wave's items as failed instead of cutting the stream
+                    logging.warning(f"Batch scoring failed for {len(ready)} resume(s): {e}")
+                    lines.extend({"index": index, "name": name, "error": str(e)} for index, name, _ in ready)
+                    ready, scores = [], []
+                resume_docs = []
+                for (index, name, result), score in zip(ready, scores):
+                    skills = result["skills"] or ["programming"]
+                    lines.append({
+                        "index": index,
+                        "name": name,
+                        "resume_score": score,
+                        "feedback": _resume_feedback(score),
+                        "skills": skills,
+                        "analysis": dict(zip(RESUME_FEATURE_NAMES, result["features"])),
+                    })
+                    resume_docs.append({
+                        "user_id": user_id or "guest",
+                        "resume_score": score,
+                        "skills": skills,
+                        "feedback": _resume_feedback(score),
+                        "batch": True,
+                        "created_at": datetime.utcnow()
+                    })
+                # Recorded per wave, so a client that disconnects mid-stream still leaves a record of what was scored
+                write_behind.resume_buffer.put(*resume_docs)
+
+            for line in sorted(lines, key=lambda l: l["index"]):
+                yield json.dumps(line) + "\n"
+    finally:
+        for task in tasks:
+            task.cancel()
+        for _, _, path, _ in items:
+            if path:
+                os.unlink(path)
+
+
+@api_router.post("/analyze-resume/batch")
+async def analyze_resume_batch_endpoint(
+    files: List[UploadFile] = File(None),
+    resume_texts: List[str] = Form(None),
+    user_id: Optional[str] = Depends(get_current_user_optional)
+):
+    """Score many resumes (PDFs, a zip of PDFs, or pasted texts); streams one NDJSON line per resume."""
+    files = files or []
+    resume_texts = resume_texts or []
 
+    items = []
     try:
-        users_count = await db.users.count_documents({}) if 'users' in await db.list_collection_names() else 0
-    except Exception:
-        users_count = 0
+        for text in resume_texts:
+            items.append((f"text-{len(items) + 1}", None, text))
+        for file in files:
+            name = file.filename or f"file-{len(items) + 1}"
+            if not name.lower().endswith(('.pdf', '.zip')):
+                raise HTTPException(status_code=400, detail=f"Unsupported file type: {name}")
+            spooled_path, _ = await _spool_upload(file)
+            if name.lower().endswith('.zip'):
+                try:
+                    members = await asyncio.to_thread(_unpack_zip, spooled_path, BATCH_MAX_RESUMES - len(items))
+                except zipfile.BadZipFile:
+                    raise HTTPException(status_code=400, detail=f"Invalid zip archive: {name}")
+                finally:
+                    os.unlink(spooled_path)
+                items.extend((member_name, path, None) for member_name, path in members)
+            else:
+                items.append((name, spooled_path, None))
+            if len(items) > BATCH_MAX_RESUMES:
+                raise HTTPException(status_code=413, detail=f"At most {BATCH_MAX_RESUMES} resumes per batch")
+    except BaseException:
+        for _, path, _ in items:
+            if path:
+                os.unlink(path)
+        raise
+
+    if not items:
+        raise HTTPException(status_code=400, detail="No resumes provided")
+
+    indexed = [(index, name, path, text) for index, (name, path, text) in enumerate(items)]
+    return StreamingResponse(_stream_batch_results(indexed, user_id), media_type="application/x-ndjson")
+
+# ── Dashboard ─────────────────────────────────────────────────────────────────
+
+@api_router.get('/dashboard')
+async def dashboard_overview():
+    # Maintained by counters.increment() on every insert; a few-second-old snapshot is fine here
+    counts = await counters.read()
+    predictions_made = counts["predictions_made"]
+    resumes_analyzed = counts["resumes_analyzed"]
+    users_count = counts["users"]
 
     if predictions_made > 20:
         user_level = 'Advanced'
@@ -470,7 +840,7 @@ async def courses_health():
     diagnostics = {}
 
     try:
-        yt_samples = get_youtube_courses(skills[0])
+        yt_samples = await get_youtube_courses(skills[0])
         diagnostics['youtube'] = {
             'enabled': True,
             'count': len(yt_samples),
@@ -480,7 +850,7 @@ async def courses_health():
         diagnostics['youtube'] = {'enabled': False, 'error': str(e)}
 
     try:
-        ud_samples = get_udemy_courses(skills[0])
+        ud_samples = await get_udemy_courses(skills[0])
         diagnostics['udemy'] = {
             'enabled': True,
             'count': len(ud_samples),
@@ -498,6 +868,28 @@ async def courses_health():
     return diagnostics
 
 
+@api_router.get('/health/models')
+async def models_health():
+    return {"backend": MODEL_BACKEND, "models": model_registry.info()}
+
+
+# ── Metrics ───────────────────────────────────────────────────────────────────
+
+metrics.register_stats("cache", cache.all_stats, label="cache")
+metrics.register_stats("analysis_pool", analysis_pool.stats)
+metrics.register_stats("passwords", passwords.stats)
+metrics.register_stats("write_behind", write_behind.all_stats, label="buffer")
+metrics.register_stats("circuit_breaker", circuit_breaker.all_stats, label="provider")
+metrics.register_stats("chat", chat.stats)
+metrics.register_stats("job_corpus", job_corpus.stats)
+
+
+@app.get('/metrics')
+async def metrics_endpoint():
+    """Prometheus text format: latency histograms plus cache/pool/upstream stats"""
+    return PlainTextResponse(metrics.render(), media_type=metrics.CONTENT_TYPE)
+
+
 # ── Mount Router ──────────────────────────────────────────────────────────────
 
 app.include_router(api_router)
@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# The backend is a flat set of modules; make them importable as in server.py
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
@@ -0,0 +1,37 @@
+"""CompiledForest must predict exactly what the sklearn forest it was built from predicts."""
+import numpy as np
+import pytest
+
+pytest.importorskip("sklearn")
+
+from sklearn.ensemble import RandomForestRegressor
+
+from forest_engine import CompiledForest
+
+
+@pytest.fixture(scope="module")
+def forest():
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(300, 8))
+    y = X[:, 0] * 3 - X[:, 3] ** 2 + rng.normal(scale=0.1, size=300)
+    return RandomForestRegressor(n_estimators=25, random_state=0).fit(X, y)
+
+
+def test_predictions_match_sklearn(forest):
+    X = np.random.default_rng(1).normal(size=(500, 8))
+    np.testing.assert_array_equal(CompiledForest.from_sklearn(forest).predict(X), forest.predict(X))
+
+
+def test_single_row_and_saved_forest_match_sklearn(forest, tmp_path):
+    compiled = CompiledForest.from_sklearn(forest)
+    compiled.save(tmp_path / "forest.npz")
+    X = np.random.default_rng(2).normal(size=(1, 8))
+    np.testing.assert_array_equal(CompiledForest.load(tmp_path / "forest.npz").predict(X), forest.predict(X))
+
+
+def test_rejects_wrongly_shaped_input(forest):
+    compiled = CompiledForest.from_sklearn(forest)
+    with pytest.raises(ValueError, match=r"2-D array with 8 columns, got shape \(8,\)"):
+        compiled.predict(np.zeros(8))
+    with pytest.raises(ValueError, match=r"got shape \(4, 7\)"):
+        compiled.predict(np.zeros((4, 7)))
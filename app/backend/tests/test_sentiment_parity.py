@@ -0,0 +1,35 @@
+"""The precompiled lexicon engine must score exactly like TextBlob (see sentiment.check_parity)."""
+import pytest
+
+pytest.importorskip("textblob")
+
+import sentiment
+from benchmarks.resumes import make_resume
+
+CORPUS = [
+    "",
+    "Software Engineer",
+    "Excellent communication skills and a great team player.",
+    "Not a bad result at all, but not very good either.",
+    "Very very good! Extremely successful launch!!",
+    "I was never unhappy with the terrible, awful, horrible legacy code.",
+    "Led a highly effective team; improved reliability by 40%.",
+    "Built an amazing, beautiful, remarkably fast search service :)",
+    "Responsible for boring and difficult migrations :(",
+    "Strong background in Python, SQL and AWS. Hard-working, reliable, creative.",
+    "EXPERIENCE: Senior developer (2018 - 2024) - managed 5 engineers",
+    "Candidate's résumé: naïve Bayes, café-style UI, well-known open-source work.",
+]
+
+
+def test_lexicon_matches_textblob_on_fixed_corpus():
+    report = sentiment.check_parity(CORPUS)
+    assert report["texts"] == len(CORPUS)
+    assert report["mismatches"] == [], [CORPUS[i] for i in report["mismatches"]]
+
+
+def test_lexicon_matches_textblob_on_synthetic_resumes():
+    resumes = [make_resume(seed, pages) for seed, pages in [(0, 1), (1, 1), (2, 3), (3, 5)]]
+    report = sentiment.check_parity(resumes)
+    assert report["mismatches"] == []
+    assert report["max_abs_diff"] <= 1e-9
@@ -0,0 +1,168 @@
+import numpy as np
+import joblib
+from scipy import sparse
+from sklearn.feature_extraction.text import CountVectorizer
+from sklearn.preprocessing import normalize
+
+# Compact the matrix once this fraction of rows has been removed
+COMPACT_RATIO = 0.25
+
+
+class TfidfIndex:
+    """
+    Incrementally updatable TF-IDF index with cosine-similarity search.
+
+    Tokenisation and weighting match sklearn's TfidfVectorizer defaults
+    (smooth idf, l2 norm), but documents can be added or removed without
+    re-tokenising the whole corpus; only the idf weights are recomputed.
+    """
+
+    def __init__(self, stop_words=None):
+        self.stop_words = stop_words
+        self._analyzer = CountVectorizer(stop_words=stop_words).build_analyzer()
+        self.vocabulary = {}
+        self.keys = []
+        self._rows = {}
+        self._alive = np.zeros(0, dtype=bool)
+        self._counts = sparse.csr_matrix((0, 0), dtype=np.float64)
+        self._df = np.zeros(0, dtype=np.int64)
+        self._idf = None
+        self._matrix = None
+
+    def __len__(self):
+        return len(self._rows)
+
+    def __contains__(self, key):
+        return key in self._rows
+
+    # -------------------- UPDATES --------------------
+    def _count_rows(self, texts, grow_vocabulary):
+        indptr, indices, data = [0], [], []
+        for text in texts:
+            counts = {}
+            for term in self._analyzer(text or ""):
+                column = self.vocabulary.get(term)
+                if column is None:
+                    if not grow_vocabulary:
+                        continue
+                    column = self.vocabulary[term] = len(self.vocabulary)
+                counts[column] = counts.get(column, 0) + 1
+            indices.extend(counts.keys())
+            data.extend(counts.values())
+            indptr.append(len(indices))
+        return sparse.csr_matrix(
+            (np.array(data, dtype=np.float64), np.array(indices, dtype=np.int64), np.array(indptr)),
+            shape=(len(texts), len(self.vocabulary)),
+        )
+
+    def add(self, keys, texts):
+        """Add (or replace) documents; existing keys are re-indexed"""
+        keys = list(keys)
+        texts = list(texts)
+        replaced = [key for key in keys if key in self._rows]
+        if replaced:
+            self.remove(replaced)
+        if not keys:
+            return
+
+        new_rows = self._count_rows(texts, grow_vocabulary=True)
+        n_terms = len(self.vocabulary)
+        counts = self._counts
+        counts.resize((counts.shape[0], n_terms))
+        self._counts = sparse.vstack([counts, new_rows], format="csr")
+
+        self._df = np.concatenate([self._df, np.zeros(n_terms - len(self._df), dtype=np.int64)])
+        self._df += np.bincount(new_rows.indices, minlength=n_terms)
+
+        start = len(self.keys)
+        for offset, key in enumerate(keys):
+            self._rows[key] = start + offset
+        self.keys.extend(keys)
+        self._alive = np.concatenate([self._alive, np.ones(len(keys), dtype=bool)])
+        self._matrix = None
+
+    def remove(self, keys):
+        rows = [self._rows.pop(key) for key in keys if key in self._rows]
+        if not rows:
+            return
+        self._alive[rows] = False
+        removed = self._counts[rows]
+        self._df -= np.bincount(removed.indices, minlength=len(self._df))
+        self._matrix = None
+        if (~self._alive).sum() > COMPACT_RATIO * len(self._alive):
+            self._compact()
+
+    def _compact(self):
+        keep = np.flatnonzero(self._alive)
+        self._counts = self._counts[keep]
+        self.keys = [self.keys[row] for row in keep]
+        self._rows = {key: row for row, key in enumerate(self.keys)}
+        self._alive = np.ones(len(self.keys), dtype=bool)
+
+    def refresh(self):
+        """Recompute idf weights and the normalised document matrix"""
+        n_docs = int(self._alive.sum())
+        self._idf = np.log((1 + n_docs) / (1 + self._df)) + 1
+        weighted = self._counts.multiply(self._idf).tocsr()
+        # normalize() rejects an empty matrix (e.g. an ingestion cycle that fetched nothing)
+        self._matrix = normalize(weighted, norm="l2", copy=False) if weighted.shape[0] else weighted
+        return self
+
+    # -------------------- QUERIES --------------------
+    def transform(self, texts):
+        """Vectorise query texts against the fitted vocabulary (unknown terms are ignored)"""
+        if self._matrix is None:
+            self.refresh()
+        counts = self._count_rows(list(texts), grow_vocabulary=False)
+        return normalize(counts.multiply(self._idf).tocsr(), norm="l2", copy=False)
+
+    def similarities(self, texts):
+        """Cosine similarity of each query text against every document (queries x rows)"""
+        queries = self.transform(texts)
+        scores = (queries @ self._matrix.T).toarray()
+        scores[:, ~self._alive] = -np.inf
+        return scores
+
+    def search_many(self, texts, top_n=5):
+        """Return [(key, score), ...] of the top_n documents for each query text"""
+        if not self._rows:
+            return [[] for _ in texts]
+        results = []
+        for scores in self.similarities(texts):
+            rows = _top_rows(scores, min(top_n, len(self._rows)))
+            results.append([(self.keys[row], float(scores[row])) for row in rows])
+        return results
+
+    def search(self, text, top_n=5):
+        return self.search_many([text], top_n)[0]
+
+    # -------------------- PERSISTENCE --------------------
+    def save(self, path):
+        joblib.dump({
+            "stop_words": self.stop_words,
+            "vocabulary": self.vocabulary,
+            "keys": self.keys,
+            "alive": self._alive,
+            "counts": self._counts,
+            "df": self._df,
+        }, path)
+
+    @classmethod
+    def load(cls, path):
+        state = joblib.load(path)
+        index = cls(stop_words=state["stop_words"])
+        index.vocabulary = state["vocabulary"]
+        index.keys = state["keys"]
+        index._alive = state["alive"]
+        index._counts = state["counts"]
+        index._df = state["df"]
+        index._rows = {key: row for row, key in enumerate(index.keys) if index._alive[row]}
+        return index.refresh()
+
+
+def _top_rows(scores, n):
+    """Indices of the n highest scores, best first (same tie order as argsort()[::-1])"""
+    if n >= len(scores) or len(scores) <= 256:
+        return np.argsort(scores)[::-1][:n]
+    candidates = np.argpartition(scores, -n)[-n:]
+    return candidates[np.argsort(scores[candidates])[::-1]]
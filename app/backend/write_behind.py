@@ -0,0 +1,150 @@
+import asyncio
+import logging
+import os
+from collections import deque
+
+from pymongo.errors import BulkWriteError
+
+import counters
+import metrics
+from database import predictions_collection, resume_collection
+
+logger = logging.getLogger(__name__)
+
+# -------------------- CONFIGURATION --------------------
+# Documents held per buffer before new ones are dropped (and counted) instead of queued
+WRITE_BEHIND_MAX_QUEUE = int(os.getenv("WRITE_BEHIND_MAX_QUEUE", "10000"))
+# A flush starts as soon as this many documents are waiting...
+WRITE_BEHIND_BATCH_SIZE = int(os.getenv("WRITE_BEHIND_BATCH_SIZE", "500"))
+# ...or this many seconds after the first one arrived
+WRITE_BEHIND_FLUSH_INTERVAL = float(os.getenv("WRITE_BEHIND_FLUSH_INTERVAL", "1.0"))
+
+_buffers = {}
+
+
+class WriteBehindBuffer:
+    """
+    Bounded in-process queue of documents written to one collection with insert_many.
+
+    Request handlers put() documents and return immediately; a background
+    task flushes them in batches of up to WRITE_BEHIND_BATCH_SIZE every
+    WRITE_BEHIND_FLUSH_INTERVAL seconds, or sooner when a batch fills up.
+    Only for audit-style writes nobody reads back within the same request.
+    """
+
+    def __init__(self, name, collection, counter=None, max_queue=WRITE_BEHIND_MAX_QUEUE,
+                 batch_size=WRITE_BEHIND_BATCH_SIZE, flush_interval=WRITE_BEHIND_FLUSH_INTERVAL):
+        self.name = name
+        self.collection = collection
+        # Dashboard counter (see counters.py) bumped by the number of documents written
+        self.counter = counter
+        self.max_queue = max_queue
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue = deque()
+        self._wakeup = None
+        self._task = None
+        self._stopping = False
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+        self.batches = 0
+        _buffers[name] = self
+
+    def put(self, *docs):
+        """Queue documents for insertion; returns False if the buffer is full and they were dropped"""
+        if len(self._queue) + len(docs) > self.max_queue:
+            self.dropped += len(docs)
+            logger.warning("Write-behind buffer %s full, dropped %d document(s)", self.name, len(docs))
+            return False
+        self._queue.extend(docs)
+        if self._wakeup is not None and len(self._queue) >= self.batch_size:
+            self._wakeup.set()
+        return True
+
+    async def flush(self):
+        """Write everything queued so far, batch_size documents per insert_many"""
+        while self._queue:
+            batch = [self._queue.popleft() for _ in range(min(self.batch_size, len(self._queue)))]
+            inserted = len(batch)
+            try:
+                with metrics.stage("db_write"):
+                    await self.collection.insert_many(batch, ordered=False)
+            except asyncio.CancelledError:
+                # Cancelled mid-write: requeue the batch so stop() can still write it
+                self._queue.extendleft(reversed(batch))
+                raise
+            except BulkWriteError as e:
+                inserted = e.details.get("nInserted", 0)
+                self.failed += len(batch) - inserted
+                logger.warning("Write-behind %s: %d of %d document(s) failed", self.name, len(batch) - inserted, len(batch))
+            except Exception as e:
+                # Connection errors, but also bad documents (bson InvalidDocument): drop this batch only
+                self.failed += len(batch)
+                logger.warning("Write-behind %s: could not write %d document(s): %s: %s",
+                               self.name, len(batch), type(e).__name__, e)
+                continue
+            self.batches += 1
+            self.written += inserted
+            if self.counter:
+                await counters.increment(**{self.counter: inserted})
+
+    async def _run(self):
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            try:
+                await self.flush()
+            except Exception:
+                logger.exception("Write-behind %s: flush failed", self.name)
+
+    def start(self):
+        if self._task is None:
+            self._stopping = False
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.ensure_future(self._run())
+
+    async def stop(self):
+        """Let the background task finish its current flush, then write whatever is still queued"""
+        if self._task is not None:
+            self._stopping = True
+            self._wakeup.set()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+            self._wakeup = None
+        await self.flush()
+
+    def stats(self):
+        return {
+            "depth": len(self._queue),
+            "max_queue": self.max_queue,
+            "written": self.written,
+            "batches": self.batches,
+            "dropped": self.dropped,
+            "failed": self.failed,
+        }
+
+
+predictions_buffer = WriteBehindBuffer("predictions", predictions_collection, counter="predictions_made")
+resume_buffer = WriteBehindBuffer("resume_analyses", resume_collection, counter="resumes_analyzed")
+
+
+# -------------------- LIFECYCLE --------------------
+def start():
+    for buffer in _buffers.values():
+        buffer.start()
+
+
+async def stop():
+    for buffer in _buffers.values():
+        await buffer.stop()
+
+
+def all_stats():
+    return {name: buffer.stats() for name, buffer in _buffers.items()}